@@ -0,0 +1,55 @@
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from backend.bench.common import app_client
+from backend.database import AsyncSessionLocal, engine
+
+# N concurrent requests that each hold Postgres for --sleep seconds. The sync
+# case runs the query on the sync engine inside a coroutine, the way the
+# routes did before the async engine, so each call blocks the event loop;
+# the async cases await asyncpg and overlap. The HTTP case goes through
+# /api/execute-query
+
+async def sync_query(sleep: float):
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_sleep(:s)"), {"s": sleep})
+
+async def async_query(sleep: float):
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("SELECT pg_sleep(:s)"), {"s": sleep})
+
+async def timed(label: str, calls) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*calls)
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<32} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+async def run(concurrency: int, sleep: float):
+    print(f"{concurrency} concurrent queries holding Postgres for {sleep}s each")
+    sync_elapsed = await timed("sync engine in a coroutine", [sync_query(sleep) for _ in range(concurrency)])
+    async_elapsed = await timed("async engine", [async_query(sleep) for _ in range(concurrency)])
+
+    payload = {"query": f"SELECT count(*) AS n FROM customers, pg_sleep({sleep})"}
+    async with app_client() as client:
+        await client.post("/api/execute-query", json=payload)
+        http_elapsed = await timed(
+            "HTTP /api/execute-query (async)",
+            [client.post("/api/execute-query", json=payload) for _ in range(concurrency)]
+        )
+
+    print(f"   throughput: sync {concurrency / sync_elapsed:.1f} req/s, async {concurrency / async_elapsed:.1f} req/s, "
+          f"HTTP {concurrency / http_elapsed:.1f} req/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare concurrent query throughput on the sync and async engines")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--sleep", type=float, default=0.1)
+    args = parser.parse_args()
+    asyncio.run(run(args.concurrency, args.sleep))
+
+if __name__ == "__main__":
+    main()
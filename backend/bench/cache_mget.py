@@ -0,0 +1,62 @@
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from backend.bench.common import app_client
+from backend.redis_client import async_redis_client
+
+# Per-key vs batched reads of N keys that are only in Redis (L1 is cold
+# because they are written straight to L2): once through the HTTP endpoints,
+# once at the Redis client level where the pipeline saves the round trips
+
+def _ms(samples):
+    return round(statistics.median(samples) * 1000, 2)
+
+async def run(keys: int, rounds: int):
+    async with app_client() as client:
+        endpoint_per_key, endpoint_batched, redis_per_key, redis_batched = [], [], [], []
+        for _ in range(rounds):
+            prefix = uuid.uuid4().hex[:8]
+            # separate key sets so neither HTTP pass finds keys the other promoted to L1
+            per_key_names = [f"bench-{prefix}-a{i}" for i in range(keys)]
+            batched_names = [f"bench-{prefix}-b{i}" for i in range(keys)]
+            cache_keys = [f"playground:{name}" for name in per_key_names + batched_names]
+            await async_redis_client.mset({k: f"value-{i}" for i, k in enumerate(cache_keys)}, {k: 60 for k in cache_keys})
+
+            start = time.perf_counter()
+            for key in cache_keys[:keys]:
+                await async_redis_client.get(key)
+                await async_redis_client.ttl(key)
+            redis_per_key.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            await async_redis_client.mget_with_ttl(cache_keys[:keys])
+            redis_batched.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for name in per_key_names:
+                await client.get(f"/api/cache/get/{name}")
+            endpoint_per_key.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            reply = (await client.post("/api/cache/mget", json={"keys": batched_names})).json()
+            endpoint_batched.append(time.perf_counter() - start)
+            assert reply["l2_hits"] == keys and reply["l2_round_trips"] == 1
+
+            await async_redis_client.mdelete(cache_keys)
+
+    print(f"{keys} keys, median of {rounds} rounds")
+    print(f"   redis client  per-key GET+TTL: {_ms(redis_per_key)} ms   pipelined mget_with_ttl: {_ms(redis_batched)} ms")
+    print(f"   HTTP          per-key /get:    {_ms(endpoint_per_key)} ms   one /mget:               {_ms(endpoint_batched)} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-key and batched cache reads")
+    parser.add_argument("--keys", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.keys, args.rounds))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from contextlib import AsyncExitStack
+from typing import List
+
+import httpx
+
+from backend.bench.common import app_client
+
+# Fires concurrent /api/db/cached-query calls at one key, first on a cold
+# miss and then once the entry has expired, and checks that Postgres ran the
+# query exactly once each time. Pass several --url values (one per worker or
+# instance) to exercise the cross-worker Redis lease as well.
+
+async def db_executions(clients: List[httpx.AsyncClient]) -> int:
+    total = 0
+    for client in clients:
+        stats = (await client.get("/api/db/query-cache/stats")).json()
+        total += stats["single_flight"]["db_executions"]
+    return total
+
+async def burst(clients: List[httpx.AsyncClient], query: str, concurrency: int, cache_ttl: int) -> dict:
+    payload = {"query": query, "cache_ttl": cache_ttl, "stale_while_revalidate": False, "early_recompute_beta": 0}
+    before = await db_executions(clients)
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(
+        clients[i % len(clients)].post("/api/db/cached-query", json=payload) for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+    failed = [r for r in responses if r.status_code != 200 or not r.json().get("success")]
+    return {
+        "executions": await db_executions(clients) - before,
+        "failed": len(failed),
+        "elapsed_ms": round(elapsed * 1000, 1),
+    }
+
+async def run(urls: List[str], concurrency: int, sleep: float, cache_ttl: int) -> bool:
+    # a fresh literal per run gives a key no earlier run has cached
+    query = f"SELECT count(*) AS n, '{uuid.uuid4().hex}' AS run FROM customers, pg_sleep({sleep})"
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(app_client(url)) for url in (urls or [None])]
+
+        ok = True
+        for phase in ("cold miss", "expired"):
+            if phase == "expired":
+                await asyncio.sleep(cache_ttl + 0.5)
+            result = await burst(clients, query, concurrency, cache_ttl)
+            passed = result["executions"] == 1 and result["failed"] == 0
+            ok = ok and passed
+            print(
+                f"{'✅' if passed else '❌'} {phase}: {concurrency} concurrent requests -> "
+                f"{result['executions']} DB execution(s), {result['failed']} failed, {result['elapsed_ms']} ms"
+            )
+        return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that concurrent cached-query misses reach Postgres once")
+    parser.add_argument("--url", action="append", default=[], help="server base URL; repeat for several workers")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--sleep", type=float, default=0.3, help="seconds the query holds Postgres")
+    parser.add_argument("--cache-ttl", type=int, default=1)
+    args = parser.parse_args()
+
+    if not asyncio.run(run(args.url, args.concurrency, args.sleep, args.cache_ttl)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+@asynccontextmanager
+async def app_client(base_url: Optional[str] = None) -> AsyncIterator[httpx.AsyncClient]:
+    # Talks to a running server when given a URL, otherwise boots the app
+    # in-process (startup/shutdown hooks included) behind an ASGI transport
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            yield client
+        return
+
+    from backend.main import app, startup_event, shutdown_event
+    await startup_event()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60) as client:
+            yield client
+    finally:
+        await shutdown_event()
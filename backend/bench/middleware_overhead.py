@@ -0,0 +1,96 @@
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+from backend.middleware import TimingMiddleware
+from backend.services.request_metrics import request_metrics
+
+# The same trivial routes behind the old @app.middleware("http") timing hook
+# (BaseHTTPMiddleware) and behind the raw ASGI TimingMiddleware that replaced
+# it. Requests run in-process through httpx's ASGITransport, so the numbers
+# are the middleware plus routing, with no network or database
+
+def build_app(kind: str) -> FastAPI:
+    app = FastAPI()
+
+    if kind == "base":
+        @app.middleware("http")
+        async def add_correlation_id(request: Request, call_next):
+            correlation_id = str(uuid.uuid4())
+            request.state.correlation_id = correlation_id
+
+            start_time = time.time()
+            response = await call_next(request)
+            process_time = time.time() - start_time
+
+            response.headers["X-Correlation-ID"] = correlation_id
+            response.headers["X-Process-Time"] = str(process_time)
+
+            route = request.scope.get("route")
+            request_metrics.record(request.method, getattr(route, "path", None), process_time, response.status_code)
+
+            return response
+    else:
+        app.add_middleware(TimingMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(100):
+                yield b"x" * 100
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    return app
+
+async def measure(app: FastAPI, path: str, requests: int, concurrency: int):
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for _ in range(50):
+            await client.get(path)
+
+        async def worker(count: int):
+            for _ in range(count):
+                start = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - start)
+                if "x-correlation-id" not in response.headers:
+                    raise RuntimeError(f"{path} answered without X-Correlation-ID")
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return sorted(latencies), elapsed
+
+def report(label: str, latencies: list, elapsed: float):
+    p50 = latencies[len(latencies) // 2] * 1e6
+    p99 = latencies[int(len(latencies) * 0.99)] * 1e6
+    print(f"   {label:<22} p50 {p50:7.1f} µs   p99 {p99:7.1f} µs   {len(latencies) / elapsed:8.0f} req/s")
+
+async def run(requests: int, concurrency: int):
+    for path in ("/ping", "/stream"):
+        print(f"GET {path}: {requests} requests, {concurrency} concurrent")
+        results = {}
+        for kind, label in (("base", "BaseHTTPMiddleware"), ("asgi", "ASGI TimingMiddleware")):
+            latencies, elapsed = await measure(build_app(kind), path, requests, concurrency)
+            report(label, latencies, elapsed)
+            results[kind] = latencies[len(latencies) // 2]
+        print(f"   p50 speedup: {results['base'] / results['asgi']:.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare BaseHTTPMiddleware against the raw ASGI TimingMiddleware")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
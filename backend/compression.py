@@ -0,0 +1,74 @@
+import zlib
+from typing import Dict, Optional
+
+from backend.config import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "application/graphql-response+json",
+    "image/svg+xml",
+    "text/",
+)
+
+compression_stats = {"compressed": 0, "precompressed_served": 0, "raw_bytes": 0, "sent_bytes": 0}
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    # Picks br over gzip when the client accepts both; anything with q=0 is refused
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip().lower())
+    if brotli is not None and ("br" in accepted or "*" in accepted):
+        return "br"
+    if "gzip" in accepted or "*" in accepted:
+        return "gzip"
+    return None
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+def compress(data: bytes, encoding: str, best: bool = False) -> bytes:
+    # best=True is for bodies compressed once and served many times
+    if encoding == "br":
+        return brotli.compress(data, quality=11 if best else settings.brotli_quality)
+    level = 9 if best else settings.gzip_level
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+def precompress(data: bytes) -> Dict[str, bytes]:
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+    return {encoding: compress(data, encoding, best=True) for encoding in encodings}
+
+class StreamCompressor:
+    # Flushes after every chunk so streamed rows still reach the client as
+    # they are produced
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=settings.brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+            return out + (self._compressor.finish() if final else self._compressor.flush())
+        out = self._compressor.compress(data)
+        return out + self._compressor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
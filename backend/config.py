@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from pydantic import EmailStr
 import os
+import tempfile
 
 class Settings(BaseSettings):
     database_url: str = os.getenv("DATABASE_URL", "")
@@ -8,6 +9,42 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Resource limits for user-submitted SQL
+    query_statement_timeout_ms: int = int(os.getenv("QUERY_STATEMENT_TIMEOUT_MS", "5000"))
+    query_work_mem: str = os.getenv("QUERY_WORK_MEM", "4MB")
+    query_max_rows: int = int(os.getenv("QUERY_MAX_ROWS", "1000"))
+    
+    # Query result cache
+    query_cache_stale_grace: int = int(os.getenv("QUERY_CACHE_STALE_GRACE", "60"))
+    query_cache_lease_ms: int = int(os.getenv("QUERY_CACHE_LEASE_MS", "6000"))
+    
+    # Streaming query results
+    query_stream_max_rows: int = int(os.getenv("QUERY_STREAM_MAX_ROWS", "100000"))
+    query_stream_batch_size: int = int(os.getenv("QUERY_STREAM_BATCH_SIZE", "500"))
+    
+    # In-process (L1) cache
+    l1_cache_max_bytes: int = int(os.getenv("L1_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+    l1_cache_purge_interval: float = float(os.getenv("L1_CACHE_PURGE_INTERVAL", "1.0"))
+    # L1 copies are revalidated against Redis after this many seconds
+    l1_cache_soft_ttl: float = float(os.getenv("L1_CACHE_SOFT_TTL", "10"))
+    # Warm start: snapshot written on shutdown, and the hottest keys prefetched from Redis
+    l1_snapshot_path: str = os.getenv("L1_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "portfolio-l1.snapshot"))
+    l1_snapshot_max_age: int = int(os.getenv("L1_SNAPSHOT_MAX_AGE", "3600"))
+    l1_prefetch_top_n: int = int(os.getenv("L1_PREFETCH_TOP_N", "200"))
+    l1_access_flush_interval: float = float(os.getenv("L1_ACCESS_FLUSH_INTERVAL", "30"))
+    
+    # Pre-encoded collections (demo posts) re-check their table version this often (seconds)
+    collection_cache_check_interval: float = float(os.getenv("COLLECTION_CACHE_CHECK_INTERVAL", "1.0"))
+    
+    # In-memory portfolio snapshot: table-version poll interval and full reload interval (seconds)
+    portfolio_snapshot_check_interval: float = float(os.getenv("PORTFOLIO_SNAPSHOT_CHECK_INTERVAL", "1.0"))
+    portfolio_snapshot_refresh_interval: float = float(os.getenv("PORTFOLIO_SNAPSHOT_REFRESH_INTERVAL", "300"))
+    
+    # Response compression: bodies smaller than this go out uncompressed
+    compression_min_size: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    gzip_level: int = int(os.getenv("GZIP_LEVEL", "6"))
+    brotli_quality: int = int(os.getenv("BROTLI_QUALITY", "5"))
+    
     # Email settings (Resend)
     resend_api_key: str = os.getenv("RESEND_API_KEY", "")
     contact_email_to: str = os.getenv("CONTACT_EMAIL_TO", "")
@@ -1,25 +1,261 @@
-from sqlalchemy import create_engine
+from fastapi import Request, Response
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+import math
 import os
+import time
+
+from backend.services.pool_metrics import pool_metrics
 
 DATABASE_URL = os.getenv("DATABASE_URL") or os.getenv("NEON_DATABASE_URL", "")
 
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is required")
 
+# "null" opens a fresh connection per checkout (friendly to serverless Postgres),
+# "queue" keeps a pool of warm connections per worker
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "null").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Comma-separated read replica URLs; reads fall back to the primary when empty or all unhealthy
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+READ_YOUR_WRITES_WINDOW = float(os.getenv("READ_YOUR_WRITES_WINDOW", "5"))
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+
+def to_async_url(url: str):
+    # asyncpg takes `ssl` instead of libpq's `sslmode` and rejects libpq-only options
+    parsed = make_url(url)
+    query = dict(parsed.query)
+    sslmode = query.pop("sslmode", None)
+    query.pop("channel_binding", None)
+    if sslmode:
+        query["ssl"] = sslmode
+    return parsed.set(drivername="postgresql+asyncpg", query=query)
+
+class _InstrumentedPoolMixin:
+    def _would_wait(self) -> bool:
+        return False
+
+    def _do_get(self):
+        waited = self._would_wait()
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception as e:
+            pool_metrics.record_failure(e)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start, waited)
+        return connection
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    pass
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    def _would_wait(self) -> bool:
+        return self.checkedin() == 0 and self._max_overflow > -1 and self._overflow >= self._max_overflow
+
+def pool_options(instrumented: bool = True) -> dict:
+    if DB_POOL_MODE == "queue":
+        return {
+            "poolclass": InstrumentedQueuePool if instrumented else AsyncAdaptedQueuePool,
+            "pool_size": DB_POOL_SIZE,
+            "max_overflow": DB_MAX_OVERFLOW,
+            "pool_timeout": DB_POOL_TIMEOUT,
+            "pool_recycle": DB_POOL_RECYCLE,
+            "pool_pre_ping": DB_POOL_PRE_PING,
+        }
+    return {"poolclass": InstrumentedNullPool if instrumented else NullPool}
+
 engine = create_engine(
     DATABASE_URL,
     poolclass=NullPool,
     connect_args={"options": "-c timezone=utc"}
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL),
+    connect_args={"server_settings": {"timezone": "utc"}},
+    **pool_options()
+)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
+
+@event.listens_for(async_engine.sync_engine.pool, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    pool_metrics.connection_checked_out()
+
+@event.listens_for(async_engine.sync_engine.pool, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    pool_metrics.connection_checked_in()
+
+def get_pool_status() -> dict:
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        pool_size = pool.size()
+        idle = pool.checkedin()
+        overflow = max(0, pool.overflow())
+    else:
+        pool_size = 0
+        idle = 0
+        overflow = 0
+    return {
+        "mode": DB_POOL_MODE,
+        "pool_size": pool_size,
+        "active_connections": pool_metrics.in_use,
+        "idle_connections": idle,
+        "wait_count": pool_metrics.wait_count,
+        "overflow_count": overflow,
+        "healthy": pool_metrics.healthy,
+        "checkouts": pool_metrics.checkouts,
+        "avg_checkout_ms": round(pool_metrics.avg_checkout_ms, 3),
+        "checkout_latency_histogram": pool_metrics.histogram(),
+        "last_error": pool_metrics.last_error,
+    }
+
+class Replica:
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.engine = create_async_engine(
+            to_async_url(url),
+            connect_args={"server_settings": {"timezone": "utc"}},
+            **pool_options(instrumented=False)
+        )
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False
+        )
+        self.outstanding = 0
+        self.healthy = True
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+        self.total_reads = 0
+
+class ReplicaRouter:
+    def __init__(self, urls: List[str]):
+        self.replicas = [Replica(f"replica-{i + 1}", url) for i, url in enumerate(urls)]
+        self.primary_reads = 0
+        self._health_task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[Replica]:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda replica: replica.outstanding)
+
+    @asynccontextmanager
+    async def session(self, use_primary: bool = False):
+        replica = None if use_primary else self.pick()
+        if replica is None:
+            self.primary_reads += 1
+            async with AsyncSessionLocal() as db:
+                yield db
+            return
+        
+        replica.outstanding += 1
+        replica.total_reads += 1
+        try:
+            async with replica.sessionmaker() as db:
+                yield db
+        finally:
+            replica.outstanding -= 1
+
+    async def _ping(self, replica: Replica):
+        async with replica.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_replica(self, replica: Replica):
+        try:
+            await asyncio.wait_for(self._ping(replica), timeout=2)
+            if not replica.healthy:
+                print(f"✅ Read replica {replica.name} is healthy again")
+            replica.healthy = True
+            replica.last_error = None
+        except Exception as e:
+            if replica.healthy:
+                print(f"⚠️ Read replica {replica.name} marked unhealthy: {e}")
+            replica.healthy = False
+            replica.last_error = str(e)
+        replica.last_check = time.time()
+
+    async def run_health_checks(self):
+        while True:
+            await asyncio.gather(*(self.check_replica(replica) for replica in self.replicas))
+            await asyncio.sleep(REPLICA_HEALTH_INTERVAL)
+
+    def start(self):
+        if self.replicas and self._health_task is None:
+            self._health_task = asyncio.create_task(self.run_health_checks())
+
+    async def stop(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def status(self) -> dict:
+        return {
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "url": replica.url,
+                    "healthy": replica.healthy,
+                    "outstanding": replica.outstanding,
+                    "total_reads": replica.total_reads,
+                    "last_error": replica.last_error,
+                    "last_check": replica.last_check,
+                }
+                for replica in self.replicas
+            ],
+            "primary_reads": self.primary_reads,
+            "read_your_writes_window": READ_YOUR_WRITES_WINDOW,
+        }
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+def is_primary_sticky(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
     try:
+        return float(request.cookies.get(PRIMARY_STICKY_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+def mark_primary_write(response: Response):
+    if not replica_router.replicas:
+        return
+    response.set_cookie(
+        PRIMARY_STICKY_COOKIE,
+        str(time.time() + READ_YOUR_WRITES_WINDOW),
+        max_age=math.ceil(READ_YOUR_WRITES_WINDOW),
+        httponly=True,
+        samesite="lax"
+    )
+
+Base = declarative_base()
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_read_db(request: Request):
+    async with replica_router.session(use_primary=is_primary_sticky(request)) as db:
         yield db
-    finally:
-        db.close()
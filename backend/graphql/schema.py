@@ -1,8 +1,7 @@
 import strawberry
 from typing import List
 
-from backend.database import SessionLocal
-from backend.models import Project
+from backend.services.portfolio_snapshot import portfolio_snapshot
 
 @strawberry.type
 class ProjectType:
@@ -13,40 +12,29 @@ class ProjectType:
     year: str
     status: str
 
+def _project_type(p) -> ProjectType:
+    return ProjectType(
+        id=int(p.id) if p.id else 0,
+        title=str(p.title),
+        description=str(p.description),
+        tech_stack=str(p.tech_stack),
+        year=str(p.year),
+        status=str(p.status)
+    )
+
 @strawberry.type
 class Query:
     @strawberry.field
-    def projects(self) -> List[ProjectType]:
-        db = SessionLocal()
-        try:
-            projects = db.query(Project).all()
-            return [ProjectType(
-                id=int(p.id) if p.id else 0,
-                title=str(p.title),
-                description=str(p.description),
-                tech_stack=str(p.tech_stack),
-                year=str(p.year),
-                status=str(p.status)
-            ) for p in projects]
-        finally:
-            db.close()
+    async def projects(self) -> List[ProjectType]:
+        data = await portfolio_snapshot.current()
+        return [_project_type(p) for p in data.projects.values()]
     
     @strawberry.field
-    def project(self, id: int) -> ProjectType:
-        db = SessionLocal()
-        try:
-            project = db.query(Project).filter(Project.id == id).first()
-            if not project:
-                raise Exception("Project not found")
-            return ProjectType(
-                id=int(project.id) if project.id else 0,
-                title=str(project.title),
-                description=str(project.description),
-                tech_stack=str(project.tech_stack),
-                year=str(project.year),
-                status=str(project.status)
-            )
-        finally:
-            db.close()
+    async def project(self, id: int) -> ProjectType:
+        data = await portfolio_snapshot.current()
+        project = data.projects.get(id)
+        if not project:
+            raise Exception("Project not found")
+        return _project_type(project)
 
 schema = strawberry.Schema(query=Query)
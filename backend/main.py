@@ -1,41 +1,37 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from strawberry.fastapi import GraphQLRouter
-import uuid
-import time
-from typing import Dict, Any
-from collections import defaultdict
-from cachetools import LRUCache
+import asyncio
+from typing import List
 from pybreaker import CircuitBreaker
 
-from backend.database import Base, engine
+from backend.database import replica_router
+from backend.middleware import CompressionMiddleware, TimingMiddleware
+from backend.services.http_client import proxy_clients
+from backend.services.portfolio_snapshot import portfolio_snapshot
+from backend.services.l1_cache import L1Cache
+from backend.services.l1_warmup import l1_warmup, warmup_stats
+from backend.services.cache_bus import cache_bus
+from backend.services.swr import revalidator
+from backend.redis_client import async_redis_client
+from backend.config import settings
 from backend.graphql.schema import schema
-from backend.services.data_service import initialize_sample_data, check_rate_limit
+from backend.services.bootstrap import run_bootstrap, bootstrap_stats
+from backend.services.request_metrics import request_metrics
+from backend.schemas import EndpointMetrics
 
 from backend.routers import portfolio, database, auth, cache, misc, chat, quiz
 
 db_connected = False
 db_error = None
 
-try:
-    Base.metadata.create_all(bind=engine)
-    db_connected = True
-    print("✅ Database connected successfully")
-except Exception as e:
-    db_error = str(e)
-    print(f"⚠️ Database connection failed: {e}")
-    print("Backend will start anyway - database endpoints may fail")
-
-l1_cache = LRUCache(maxsize=100)
+l1_cache = L1Cache(settings.l1_cache_max_bytes, settings.l1_cache_purge_interval)
 l1_stats = {"hits": 0, "misses": 0}
 l2_stats = {"hits": 0, "misses": 0}
 
 circuit_breaker = CircuitBreaker(fail_max=5, reset_timeout=60)
 
-request_metrics: Dict[str, Dict[str, Any]] = defaultdict(
-    lambda: {"count": 0, "total_time": 0.0, "errors": 0, "times": []}
-)
-
 app = FastAPI(title="Dilroop Portfolio API")
 
 graphql_app = GraphQLRouter(schema)
@@ -48,6 +44,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware, minimum_size=settings.compression_min_size)
+app.add_middleware(TimingMiddleware)
 
 cache.set_cache_references(l1_cache, l1_stats, l2_stats)
 misc.set_circuit_breaker(circuit_breaker)
@@ -60,38 +58,40 @@ app.include_router(misc.router)
 app.include_router(chat.router)
 app.include_router(quiz.router)
 
-@app.middleware("http")
-async def add_correlation_id(request: Request, call_next):
-    correlation_id = str(uuid.uuid4())
-    request.state.correlation_id = correlation_id
-    
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    
-    response.headers["X-Correlation-ID"] = correlation_id
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    endpoint = f"{request.method} {request.url.path}"
-    request_metrics[endpoint]["count"] += 1
-    request_metrics[endpoint]["total_time"] += process_time
-    request_metrics[endpoint]["times"].append(process_time)
-    if response.status_code >= 400:
-        request_metrics[endpoint]["errors"] += 1
-    
-    return response
-
 @app.on_event("startup")
 async def startup_event():
-    global db_connected
-    if db_connected:
-        try:
-            initialize_sample_data()
-            print("✅ Sample data initialized")
-        except Exception as e:
-            print(f"⚠️ Failed to initialize sample data: {e}")
+    global db_connected, db_error
+    try:
+        stats = await asyncio.to_thread(run_bootstrap)
+        db_connected = True
+        print(f"✅ Database connected successfully (schema v{stats['schema_version']} {stats['action']} in {stats['duration_ms']} ms)")
+    except Exception as e:
+        db_error = str(e)
+        print(f"⚠️ Database connection failed: {e}")
+        print("Backend will start anyway - database endpoints may fail")
+    
+    if await async_redis_client.connect():
+        print("✅ Redis connected")
     else:
-        print("⚠️ Skipping data initialization - database not connected")
+        print("⚠️ Redis not reachable yet, retrying in the background")
+    replica_router.start()
+    await portfolio_snapshot.start()
+    proxy_clients.start(app)
+    l1_cache.start()
+    await l1_warmup.start(l1_cache, l1_stats)
+    print(f"✅ L1 warmed in {warmup_stats['time_to_warm_ms']} ms ({warmup_stats['snapshot_loaded']} from snapshot, {warmup_stats['prefetched']} prefetched)")
+    cache_bus.start(l1_cache)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await replica_router.stop()
+    await portfolio_snapshot.stop()
+    await proxy_clients.close()
+    await l1_cache.stop()
+    await cache_bus.stop()
+    await revalidator.stop()
+    await l1_warmup.stop()
+    await async_redis_client.close()
 
 @app.get("/")
 async def root():
@@ -103,10 +103,21 @@ async def health_check():
         "status": "running",
         "database": {
             "connected": db_connected,
-            "error": db_error if not db_connected else None
-        }
+            "error": db_error if not db_connected else None,
+            "bootstrap": bootstrap_stats
+        },
+        "redis": async_redis_client.status(),
+        "portfolio_snapshot": portfolio_snapshot.status()
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(request_metrics.prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/endpoints", response_model=List[EndpointMetrics])
+async def endpoint_metrics():
+    return request_metrics.summary()
+
 @app.get("/health/db")
 async def database_health():
     if not db_connected:
@@ -121,14 +132,14 @@ async def database_health():
         }
     
     try:
-        from backend.database import SessionLocal
+        from backend.database import async_engine, get_pool_status
         from sqlalchemy import text
-        db = SessionLocal()
-        db.execute(text("SELECT 1"))
-        db.close()
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return {
             "status": "connected",
-            "message": "Database is healthy and responding"
+            "message": "Database is healthy and responding",
+            "pool": get_pool_status()
         }
     except Exception as e:
         return {
@@ -0,0 +1,177 @@
+import os
+import time
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.routing import Mount
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.compression import StreamCompressor, compress, compression_stats, is_compressible, negotiate
+from backend.services.request_metrics import request_metrics
+
+CORRELATION_HEADER = b"x-correlation-id"
+MAX_CORRELATION_ID_LENGTH = 128
+
+def _route_templates(routes, prefix: str = "") -> dict:
+    # id(endpoint) -> full path template, through Mounts and nested routers.
+    # Keyed by id() because mounted apps are not always hashable
+    templates = {}
+    for route in routes:
+        path = prefix + (getattr(route, "path", None) or "")
+        nested = getattr(route, "routes", None)
+        if nested:
+            for endpoint_id, template in _route_templates(nested, path).items():
+                templates.setdefault(endpoint_id, template)
+        elif isinstance(route, Mount):
+            templates.setdefault(id(route.app), path + "/{path}")
+        elif getattr(route, "endpoint", None) is not None:
+            templates.setdefault(id(route.endpoint), path)
+    return templates
+
+class TimingMiddleware:
+    # Plain ASGI rather than @app.middleware("http"): BaseHTTPMiddleware runs
+    # the app in a separate task and re-streams the body, which costs time on
+    # every request and buffers streaming responses
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates = None
+
+    def route_template(self, scope: Scope, root_path: str) -> Optional[str]:
+        # Only APIRoutes reliably leave themselves in scope["route"]; docs,
+        # openapi.json, Mounts and routes included under a prefix are found
+        # by endpoint. "unmatched" is left for requests no route took
+        route = scope.get("route")
+        endpoint = scope.get("endpoint")
+        if route is None and endpoint is None:
+            return None
+        # Mounts move root_path forward by the part of the path they matched
+        prefix = scope.get("root_path", "")[len(root_path):]
+        path = getattr(route, "path", None)
+        if path:
+            return prefix + path
+        if self._templates is None and "app" in scope:
+            self._templates = _route_templates(scope["app"].routes)
+        template = (self._templates or {}).get(id(endpoint))
+        if template:
+            return template
+        if not scope.get("path_params"):
+            # without parameters the template is the path itself
+            return scope["path"]
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        correlation_id = None
+        for name, value in scope["headers"]:
+            if name == CORRELATION_HEADER:
+                if 0 < len(value) <= MAX_CORRELATION_ID_LENGTH:
+                    correlation_id = value
+                break
+        if correlation_id is None:
+            correlation_id = os.urandom(16).hex().encode()
+        scope.setdefault("state", {})["correlation_id"] = correlation_id.decode("latin-1")
+
+        root_path = scope.get("root_path", "")
+        start = time.perf_counter_ns()
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                process_time = (time.perf_counter_ns() - start) / 1e9
+                headers = list(message.get("headers", []))
+                headers.append((b"x-correlation-id", correlation_id))
+                headers.append((b"x-process-time", str(process_time).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # recorded once the body has been sent, so streamed responses count in full
+            request_metrics.record(
+                scope["method"], self.route_template(scope, root_path), (time.perf_counter_ns() - start) / 1e9, status_code
+            )
+
+class CompressionMiddleware:
+    # gzip/br by Accept-Encoding. Bodies below minimum_size and responses that
+    # already carry a Content-Encoding (the precompressed collection bodies)
+    # go out untouched; streamed responses are compressed chunk by chunk
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate(value.decode("latin-1"))
+                break
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                data = compressor.chunk(body, final=not more_body)
+                compression_stats["raw_bytes"] += len(body)
+                compression_stats["sent_bytes"] += len(data)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                "content-encoding" in headers
+                or start_message["status"] in (204, 304)
+                or not is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.minimum_size)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # the compressed bytes are a different representation
+                headers["ETag"] = f"W/{etag}"
+            compression_stats["compressed"] += 1
+            if more_body:
+                if "content-length" in headers:
+                    del headers["Content-Length"]
+                compressor = StreamCompressor(encoding)
+                data = compressor.chunk(body, final=False)
+            else:
+                data = compress(body, encoding)
+                headers["Content-Length"] = str(len(data))
+            compression_stats["raw_bytes"] += len(body)
+            compression_stats["sent_bytes"] += len(data)
+            start_message["headers"] = headers.raw
+            await send(start_message)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,116 +1,373 @@
 import redis
-import json
+import redis.asyncio as aioredis
+import asyncio
 import os
-from typing import Optional, Any
+import random
+import time
+from typing import Optional, Any, AsyncIterator, Awaitable, Callable, Dict
 from datetime import timedelta
 
+from backend.redis_codec import RedisCodec, default_codec
+
+# Namespaces (the part of a key before the first ':') whose live keys are
+# indexed in a sorted set scored by expiry, so they can be counted without
+# walking the keyspace
+TRACKED_NAMESPACES = ("playground", "query_cache", "task", "blacklist")
+KEYSPACE_INDEX_PREFIX = "keyspace:"
+SCAN_COUNT = 500
+
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_BREAKER_FAIL_MAX = int(os.getenv("REDIS_BREAKER_FAIL_MAX", "3"))
+REDIS_RECONNECT_BASE = float(os.getenv("REDIS_RECONNECT_BASE", "0.5"))
+REDIS_RECONNECT_MAX = float(os.getenv("REDIS_RECONNECT_MAX", "30"))
+
+# Errors that say Redis itself is unreachable, as opposed to a bad command
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError, OSError)
+
+class RedisBreaker:
+    # closed: use Redis. open: skip it until a reconnect attempt succeeds;
+    # attempts are spaced with exponential backoff plus jitter
+    def __init__(self, fail_max: int = REDIS_BREAKER_FAIL_MAX):
+        self.fail_max = fail_max
+        self.state = "closed"
+        self.failures = 0
+        self.attempts = 0
+        self.opened_count = 0
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+        self.last_success: Optional[float] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.state == "closed"
+
+    def record_success(self):
+        if self.state != "closed":
+            print("✅ Redis reachable again, leaving degraded mode")
+        self.state = "closed"
+        self.failures = 0
+        self.attempts = 0
+        self.last_success = time.time()
+
+    def record_failure(self, error: Exception) -> bool:
+        # Returns True when this failure opened the breaker
+        self.failures += 1
+        self.last_error = f"{type(error).__name__}: {error}"
+        if self.state == "closed" and self.failures < self.fail_max:
+            return False
+        opened = self.state == "closed"
+        if opened:
+            self.opened_count += 1
+            print(f"⚠️ Redis unavailable, running without it: {self.last_error}")
+        self.state = "open"
+        backoff = min(REDIS_RECONNECT_MAX, REDIS_RECONNECT_BASE * 2 ** self.attempts)
+        self.retry_at = time.time() + backoff * random.uniform(0.5, 1.0)
+        self.attempts += 1
+        return opened
+
+    def trip(self, error: Exception):
+        self.failures = max(self.failures, self.fail_max - 1)
+        self.record_failure(error)
+
+    def retry_due(self) -> bool:
+        return self.state == "open" and time.time() >= self.retry_at
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "reconnect_attempts": self.attempts,
+            "times_opened": self.opened_count,
+            "retry_in_s": round(max(0.0, self.retry_at - time.time()), 2) if self.state == "open" else None,
+            "last_error": self.last_error,
+            "last_success": self.last_success,
+        }
+
+def _index_key(key: str) -> Optional[str]:
+    namespace = key.split(":", 1)[0]
+    if namespace != key and namespace in TRACKED_NAMESPACES:
+        return f"{KEYSPACE_INDEX_PREFIX}{namespace}"
+    return None
+
+# Pipeline builders for the asyncio client; queuing commands is synchronous,
+# only execute() is awaited
+def _queue_set(pipe, key: str, value: Any, expiry: Optional[int], index_key: Optional[str]):
+    pipe.set(key, value, ex=expiry or None)
+    if index_key is not None:
+        now = time.time()
+        pipe.zadd(index_key, {key: now + expiry if expiry else float("inf")})
+        pipe.zremrangebyscore(index_key, "-inf", now)
+
+def _queue_delete(pipe, keys: list):
+    pipe.delete(*keys)
+    by_index: Dict[str, list] = {}
+    for key in keys:
+        index_key = _index_key(key)
+        if index_key is not None:
+            by_index.setdefault(index_key, []).append(key)
+    for index_key, indexed in by_index.items():
+        pipe.zrem(index_key, *indexed)
+
+def _queue_unlink(pipe, keys: list, index_key: Optional[str]):
+    pipe.unlink(*keys)
+    if index_key is not None:
+        pipe.zrem(index_key, *keys)
+
+def _queue_count(pipe, namespace: str):
+    index_key = f"{KEYSPACE_INDEX_PREFIX}{namespace}"
+    pipe.zremrangebyscore(index_key, "-inf", time.time())
+    pipe.zcard(index_key)
+
 class RedisClient:
+    # Sync client for code running outside the event loop; its one user is
+    # bump_tables_sync (bootstrap and the data generator). Everything served
+    # from requests goes through AsyncRedisClient
     def __init__(self, host='localhost', port=6379, db=0):
-        try:
-            self.client = redis.Redis(
-                host=host,
-                port=port,
-                db=db,
-                decode_responses=True,
-                socket_connect_timeout=2
-            )
-            self.client.ping()
-        except redis.ConnectionError:
-            self.client = None
+        self.breaker = RedisBreaker()
+        # Nothing connects here: redis-py opens sockets on first use, and
+        # is_connected() probes lazily so a Redis that starts later is picked up
+        self.client = redis.Redis(
+            host=host,
+            port=port,
+            db=db,
+            decode_responses=True,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT
+        )
+        self._probed = False
     
     def is_connected(self) -> bool:
-        return self.client is not None
+        if self.breaker.closed and self._probed:
+            return True
+        if not self._probed or self.breaker.retry_due():
+            self._probed = True
+            try:
+                self.client.ping()
+                self.breaker.record_success()
+            except CONNECTION_ERRORS as e:
+                self.breaker.trip(e)
+        return self.breaker.closed
+    
+    def record_error(self, error: Exception):
+        # one connection error is enough to skip Redis until the next
+        # backoff-spaced probe
+        if isinstance(error, CONNECTION_ERRORS):
+            self.breaker.trip(error)
     
     @property
     def redis(self):
         return self.client
+
+redis_host = os.getenv('REDIS_HOST', 'localhost')
+redis_port = int(os.getenv('REDIS_PORT', '6379'))
+redis_client = RedisClient(host=redis_host, port=redis_port)
+
+class AsyncRedisClient:
+    # asyncio counterpart of RedisClient for request handlers. Both
+    # connection pools are created once at startup and shared by every
+    # request, bounded by REDIS_MAX_CONNECTIONS. Connection errors feed a
+    # breaker: while it is open is_connected() is False, so callers skip Redis
+    # immediately instead of waiting out socket timeouts, and a background
+    # task reconnects with backoff
+    def __init__(self, host='localhost', port=6379, db=0, codec: RedisCodec = default_codec):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.codec = codec
+        self.breaker = RedisBreaker()
+        self.client: Optional[aioredis.Redis] = None
+        self.binary: Optional[aioredis.Redis] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
     
-    def set(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
-        if not self.is_connected():
-            return False
-        try:
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-            if expiry:
-                return self.client.setex(key, expiry, value)
-            return self.client.set(key, value)
-        except Exception:
-            return False
+    def _pool(self, decode_responses: bool) -> aioredis.ConnectionPool:
+        return aioredis.ConnectionPool(
+            host=self.host,
+            port=self.port,
+            db=self.db,
+            decode_responses=decode_responses,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL
+        )
     
-    def get(self, key: str) -> Optional[Any]:
-        if not self.is_connected():
-            return None
+    async def connect(self) -> bool:
+        if self.client is None:
+            self.client = aioredis.Redis(connection_pool=self._pool(decode_responses=True))
+            self.binary = aioredis.Redis(connection_pool=self._pool(decode_responses=False))
         try:
-            value = self.client.get(key)
-            if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
-            return None
-        except Exception:
-            return None
-    
-    def delete(self, key: str) -> bool:
-        if not self.is_connected():
-            return False
-        try:
-            return bool(self.client.delete(key))
-        except Exception:
+            await self.client.ping()
+        except CONNECTION_ERRORS as e:
+            self.breaker.trip(e)
+            self._schedule_reconnect()
             return False
+        self.breaker.record_success()
+        return True
     
-    def exists(self, key: str) -> bool:
-        if not self.is_connected():
-            return False
-        try:
-            return bool(self.client.exists(key))
-        except Exception:
-            return False
+    async def close(self):
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        for client in (self.client, self.binary):
+            if client is not None:
+                await client.aclose(close_connection_pool=True)
+        self.client = None
+        self.binary = None
     
-    def incr(self, key: str) -> Optional[int]:
-        if not self.is_connected():
-            return None
-        try:
-            return self.client.incr(key)
-        except Exception:
-            return None
+    async def _reconnect(self):
+        while self.client is not None and not self.breaker.closed:
+            await asyncio.sleep(max(0.0, self.breaker.retry_at - time.time()))
+            try:
+                await self.client.ping()
+                self.breaker.record_success()
+            except CONNECTION_ERRORS as e:
+                self.breaker.record_failure(e)
+        self._reconnect_task = None
     
-    def expire(self, key: str, seconds: int) -> bool:
-        if not self.is_connected():
-            return False
-        try:
-            return bool(self.client.expire(key, seconds))
-        except Exception:
-            return False
+    def _schedule_reconnect(self):
+        if self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
     
-    def ttl(self, key: str) -> int:
-        if not self.is_connected():
-            return -1
-        try:
-            return self.client.ttl(key)
-        except Exception:
-            return -1
+    def record_error(self, error: Exception):
+        # Also used by callers that talk to .redis directly
+        if isinstance(error, CONNECTION_ERRORS) and self.breaker.record_failure(error):
+            self._schedule_reconnect()
     
-    def keys(self, pattern: str = '*') -> list:
+    async def call(self, operation: Callable[[], Awaitable[Any]], default: Any = None) -> Any:
         if not self.is_connected():
-            return []
+            return default
         try:
-            return self.client.keys(pattern)
-        except Exception:
+            result = await operation()
+        except Exception as e:
+            self.record_error(e)
+            return default
+        self.breaker.record_success()
+        return result
+    
+    def is_connected(self) -> bool:
+        return self.client is not None and self.breaker.closed
+    
+    @property
+    def redis(self) -> Optional[aioredis.Redis]:
+        return self.client
+    
+    def status(self) -> dict:
+        return {"connected": self.is_connected(), **self.breaker.status()}
+    
+    async def set(self, key: str, value: Any, expiry: Optional[int] = None) -> bool:
+        async def operation():
+            encoded = self.codec.encode(value)
+            index_key = _index_key(key)
+            if index_key is None:
+                return await self.binary.set(key, encoded, ex=expiry or None)
+            pipe = self.binary.pipeline(transaction=False)
+            _queue_set(pipe, key, encoded, expiry, index_key)
+            return (await pipe.execute())[0]
+        return bool(await self.call(operation, False))
+    
+    async def get(self, key: str) -> Optional[Any]:
+        async def operation():
+            return self.codec.decode(await self.binary.get(key))
+        return await self.call(operation)
+    
+    async def mset(self, items: Dict[str, Any], expiries: Optional[Dict[str, Optional[int]]] = None) -> bool:
+        if not items:
+            return False
+        expiries = expiries or {}
+        async def operation():
+            pipe = self.binary.pipeline(transaction=False)
+            for key, value in items.items():
+                _queue_set(pipe, key, self.codec.encode(value), expiries.get(key), _index_key(key))
+            await pipe.execute()
+            return True
+        return await self.call(operation, False)
+    
+    async def mget_with_ttl(self, keys: list) -> list:
+        async def operation():
+            pipe = self.binary.pipeline(transaction=False)
+            for key in keys:
+                pipe.get(key)
+                pipe.ttl(key)
+            replies = await pipe.execute()
+            return [(self.codec.decode(replies[i]), replies[i + 1]) for i in range(0, len(replies), 2)]
+        if not keys:
             return []
+        return await self.call(operation, [(None, -2) for _ in keys])
+    
+    async def mdelete(self, keys: list) -> int:
+        async def operation():
+            pipe = self.client.pipeline(transaction=False)
+            _queue_delete(pipe, keys)
+            return (await pipe.execute())[0]
+        if not keys:
+            return 0
+        return await self.call(operation, 0)
+    
+    async def delete(self, key: str) -> bool:
+        return bool(await self.mdelete([key]))
+    
+    async def exists(self, key: str) -> bool:
+        return bool(await self.call(lambda: self.client.exists(key), False))
+    
+    async def incr(self, key: str) -> Optional[int]:
+        return await self.call(lambda: self.client.incr(key))
     
-    def get_all_keys(self) -> list:
-        return self.keys('*')
+    async def expire(self, key: str, seconds: int) -> bool:
+        return bool(await self.call(lambda: self.client.expire(key, seconds), False))
     
-    def flush_db(self) -> bool:
+    async def ttl(self, key: str) -> int:
+        return await self.call(lambda: self.client.ttl(key), -1)
+    
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.call(lambda: self.client.publish(channel, message), 0)
+    
+    async def scan_iter(self, match: str = '*', count: int = SCAN_COUNT) -> AsyncIterator[str]:
         if not self.is_connected():
-            return False
-        try:
-            return self.client.flushdb()
-        except Exception:
-            return False
+            return
+        async for key in self.client.scan_iter(match=match, count=count):
+            yield key
+    
+    async def keys(self, pattern: str = '*') -> list:
+        async def operation():
+            return [key async for key in self.scan_iter(pattern)]
+        return await self.call(operation, [])
+    
+    async def get_all_keys(self) -> list:
+        return await self.keys('*')
+    
+    async def unlink_prefix(self, prefix: str, batch_size: int = SCAN_COUNT) -> int:
+        index_key = _index_key(prefix)
+        async def operation():
+            removed = 0
+            batch = []
+            async for key in self.client.scan_iter(match=f"{prefix}*", count=batch_size):
+                batch.append(key)
+                if len(batch) >= batch_size:
+                    removed += await self._unlink_batch(batch, index_key)
+                    batch = []
+            if batch:
+                removed += await self._unlink_batch(batch, index_key)
+            return removed
+        return await self.call(operation, 0)
+    
+    async def _unlink_batch(self, keys: list, index_key: Optional[str]) -> int:
+        pipe = self.client.pipeline(transaction=False)
+        _queue_unlink(pipe, keys, index_key)
+        return (await pipe.execute())[0]
+    
+    async def dbsize(self) -> int:
+        return await self.call(lambda: self.client.dbsize(), 0)
+    
+    async def namespace_counts(self) -> Dict[str, int]:
+        async def operation():
+            pipe = self.client.pipeline(transaction=False)
+            for namespace in TRACKED_NAMESPACES:
+                _queue_count(pipe, namespace)
+            replies = await pipe.execute()
+            return dict(zip(TRACKED_NAMESPACES, replies[1::2]))
+        return await self.call(operation, {namespace: 0 for namespace in TRACKED_NAMESPACES})
 
-# Initialize with environment variables (works for both Docker and local)
-redis_host = os.getenv('REDIS_HOST', 'localhost')
-redis_port = int(os.getenv('REDIS_PORT', '6379'))
-redis_client = RedisClient(host=redis_host, port=redis_port)
\ No newline at end of file
+async_redis_client = AsyncRedisClient(host=redis_host, port=redis_port)
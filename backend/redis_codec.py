@@ -0,0 +1,255 @@
+import json
+import os
+import time
+import zlib
+from datetime import date, datetime, time as dt_time
+from decimal import Decimal
+from typing import Any, Dict
+from uuid import UUID
+
+import orjson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Encoded values start with MAGIC (0xC1 never appears in UTF-8, so older plain
+# text/JSON values can't be mistaken for it), then one byte naming the
+# serializer and one naming the compressor
+MAGIC = b"\xc1"
+TYPE_TAG = "__t"
+
+codec_stats = {
+    "encoded": 0,
+    "decoded": 0,
+    "legacy_decoded": 0,
+    "compressed": 0,
+    "raw_bytes": 0,
+    "stored_bytes": 0,
+    "encode_ms": 0.0,
+    "decode_ms": 0.0,
+}
+
+def _tag(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return {TYPE_TAG: "decimal", "v": str(obj)}
+    if isinstance(obj, datetime):
+        return {TYPE_TAG: "datetime", "v": obj.isoformat()}
+    if isinstance(obj, date):
+        return {TYPE_TAG: "date", "v": obj.isoformat()}
+    if isinstance(obj, dt_time):
+        return {TYPE_TAG: "time", "v": obj.isoformat()}
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not cacheable: {type(obj).__name__}")
+
+_UNTAG = {
+    "decimal": Decimal,
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": dt_time.fromisoformat,
+}
+
+def _untag(value: Any) -> Any:
+    if isinstance(value, dict):
+        if value.get(TYPE_TAG) in _UNTAG and len(value) == 2:
+            return _UNTAG[value[TYPE_TAG]](value["v"])
+        return {k: _untag(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_untag(item) for item in value]
+    return value
+
+class OrjsonSerializer:
+    tag = b"j"
+    name = "orjson"
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=_tag, option=self.options)
+
+    def loads(self, payload: bytes) -> Any:
+        value = orjson.loads(payload)
+        # only walk the structure when something was actually tagged
+        return _untag(value) if b'"__t"' in payload else value
+
+class MsgpackSerializer:
+    tag = b"m"
+    name = "msgpack"
+
+    def dumps(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=_tag, datetime=False)
+
+    def loads(self, payload: bytes) -> Any:
+        value = msgpack.unpackb(payload, strict_map_key=False)
+        return _untag(value) if TYPE_TAG.encode() in payload else value
+
+class TextSerializer:
+    tag = b"s"
+    name = "text"
+
+    def dumps(self, value: str) -> bytes:
+        return value.encode()
+
+    def loads(self, payload: bytes) -> str:
+        return payload.decode()
+
+class BytesSerializer:
+    tag = b"b"
+    name = "bytes"
+
+    def dumps(self, value: bytes) -> bytes:
+        return bytes(value)
+
+    def loads(self, payload: bytes) -> bytes:
+        return payload
+
+class NoCompression:
+    tag = b"n"
+    name = "none"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+class ZstdCompression:
+    tag = b"z"
+    name = "zstd"
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=3)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+class Lz4Compression:
+    tag = b"l"
+    name = "lz4"
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+class ZlibCompression:
+    tag = b"d"
+    name = "zlib"
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, 6)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+SERIALIZERS: Dict[bytes, Any] = {s.tag: s for s in (OrjsonSerializer(), TextSerializer(), BytesSerializer())}
+if msgpack is not None:
+    SERIALIZERS[MsgpackSerializer.tag] = MsgpackSerializer()
+
+COMPRESSORS: Dict[bytes, Any] = {c.tag: c for c in (NoCompression(), ZlibCompression())}
+if zstandard is not None:
+    COMPRESSORS[ZstdCompression.tag] = ZstdCompression()
+if lz4_frame is not None:
+    COMPRESSORS[Lz4Compression.tag] = Lz4Compression()
+
+def _by_name(registry: Dict[bytes, Any], name: str):
+    return next((item for item in registry.values() if item.name == name), None)
+
+def _default_compressor():
+    for name in ("zstd", "lz4", "zlib"):
+        compressor = _by_name(COMPRESSORS, name)
+        if compressor is not None:
+            return compressor
+
+class RedisCodec:
+    def __init__(self, serializer: str = "orjson", compression: str = "auto", threshold: int = 1024):
+        self.serializer = _by_name(SERIALIZERS, serializer) or SERIALIZERS[OrjsonSerializer.tag]
+        self.compressor = _default_compressor() if compression == "auto" else _by_name(COMPRESSORS, compression)
+        if self.compressor is None:
+            print(f"⚠️ Redis compression '{compression}' is not available, storing values uncompressed")
+            self.compressor = COMPRESSORS[NoCompression.tag]
+        self.threshold = threshold
+
+    def encode(self, value: Any) -> bytes:
+        start = time.perf_counter()
+        if isinstance(value, str):
+            serializer = SERIALIZERS[TextSerializer.tag]
+        elif isinstance(value, (bytes, bytearray)):
+            serializer = SERIALIZERS[BytesSerializer.tag]
+        else:
+            serializer = self.serializer
+        payload = serializer.dumps(value)
+
+        compressor = COMPRESSORS[NoCompression.tag]
+        stored = payload
+        if len(payload) >= self.threshold and self.compressor.tag != NoCompression.tag:
+            compressed = self.compressor.compress(payload)
+            if len(compressed) < len(payload):
+                compressor, stored = self.compressor, compressed
+                codec_stats["compressed"] += 1
+
+        codec_stats["encoded"] += 1
+        codec_stats["raw_bytes"] += len(payload)
+        codec_stats["stored_bytes"] += len(stored)
+        codec_stats["encode_ms"] += (time.perf_counter() - start) * 1000
+        return MAGIC + serializer.tag + compressor.tag + stored
+
+    def decode(self, data: Any) -> Any:
+        if data is None:
+            return None
+        start = time.perf_counter()
+        try:
+            if not isinstance(data, bytes) or not data.startswith(MAGIC):
+                return self._decode_legacy(data)
+            serializer, compressor = SERIALIZERS[data[1:2]], COMPRESSORS[data[2:3]]
+            value = serializer.loads(compressor.decompress(data[3:]))
+            codec_stats["decoded"] += 1
+            return value
+        finally:
+            codec_stats["decode_ms"] += (time.perf_counter() - start) * 1000
+
+    def _decode_legacy(self, data: Any) -> Any:
+        # Values written before the codec existed: plain text, maybe JSON
+        codec_stats["legacy_decoded"] += 1
+        if isinstance(data, bytes):
+            try:
+                data = data.decode()
+            except UnicodeDecodeError:
+                return data
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError:
+            return data
+
+def get_codec_stats() -> dict:
+    return {
+        **{k: round(v, 3) if isinstance(v, float) else v for k, v in codec_stats.items()},
+        "bytes_saved": codec_stats["raw_bytes"] - codec_stats["stored_bytes"],
+        "serializer": default_codec.serializer.name,
+        "compression": default_codec.compressor.name,
+        "compress_threshold": default_codec.threshold,
+    }
+
+default_codec = RedisCodec(
+    serializer=os.getenv("REDIS_CODEC", "orjson"),
+    compression=os.getenv("REDIS_COMPRESSION", "auto"),
+    threshold=int(os.getenv("REDIS_COMPRESS_THRESHOLD", "1024"))
+)
@@ -13,7 +13,7 @@ from backend.schemas import (
     RBACPermissionCheck, RBACResponse
 )
 from backend.config import settings
-from backend.redis_client import redis_client
+from backend.redis_client import async_redis_client
 
 router = APIRouter(prefix="/api", tags=["auth"])
 
@@ -103,7 +103,7 @@ async def refresh_access_token(request: RefreshTokenRequest):
         if decoded.get("type") != "refresh":
             raise HTTPException(status_code=400, detail="Invalid token type")
         
-        if redis_client.exists(f"blacklist:{decoded['jti']}"):
+        if await async_redis_client.exists(f"blacklist:{decoded['jti']}"):
             raise HTTPException(status_code=401, detail="Token has been revoked")
         
         new_jti = str(uuid.uuid4())
@@ -132,11 +132,11 @@ async def revoke_token(request: RevokeTokenRequest):
         decoded = jwt.decode(request.token, settings.secret_key, algorithms=["HS256"])
         jti = decoded.get("jti")
         
-        if jti and redis_client.is_connected():
+        if jti and async_redis_client.is_connected():
             exp = decoded.get("exp")
             if exp:
                 ttl = int(exp - datetime.utcnow().timestamp())
-                redis_client.set(f"blacklist:{jti}", "revoked", ttl)
+                await async_redis_client.set(f"blacklist:{jti}", "revoked", ttl)
         
         return {"message": "Token revoked successfully", "jti": jti}
     except JWTError as e:
@@ -148,7 +148,7 @@ async def validate_token(request: ValidateTokenRequest):
         decoded = jwt.decode(request.token, settings.secret_key, algorithms=[request.algorithm])
         
         jti = decoded.get("jti")
-        if jti and redis_client.exists(f"blacklist:{jti}"):
+        if jti and await async_redis_client.exists(f"blacklist:{jti}"):
             return ValidateTokenResponse(
                 valid=False,
                 error="Token has been revoked"
@@ -3,9 +3,17 @@ import time
 
 from backend.schemas import (
     CacheSetRequest, CacheSetResponse, CacheGetResponse,
-    CacheOperationResponse, MultiLevelCacheStats
+    CacheOperationResponse, MultiLevelCacheStats,
+    CacheMSetRequest, CacheKeysRequest, CacheMGetResponse
 )
-from backend.redis_client import redis_client
+from backend.redis_client import async_redis_client
+from backend.redis_codec import get_codec_stats
+from backend.services.cache_bus import cache_bus
+from backend.services.swr import revalidator, swr_stats, get_swr_stats
+from backend.services.l1_warmup import l1_warmup
+from backend.services.response_cache import collection_cache
+from backend.compression import compression_stats
+from backend.config import settings
 
 router = APIRouter(prefix="/api/cache", tags=["cache"])
 
@@ -19,15 +27,14 @@ def set_cache_references(cache, stats1, stats2):
     l1_stats = stats1
     l2_stats = stats2
 
+def _promotion_ttl(ttl_remaining: int):
+    # Maps a Redis TTL reply to (ttl to report, L1 expire_at)
+    if ttl_remaining and ttl_remaining > 0:
+        return ttl_remaining, time.time() + ttl_remaining
+    return None, None
+
 @router.get("/stats", response_model=MultiLevelCacheStats)
 async def get_cache_stats():
-    l2_keys_count = 0
-    if redis_client.is_connected():
-        try:
-            l2_keys_count = len(redis_client.get_all_keys())
-        except:
-            l2_keys_count = 0
-    
     total_requests = l1_stats["hits"] + l1_stats["misses"]
     total_hits = l1_stats["hits"] + l2_stats["hits"]
     hit_rate = (total_hits / total_requests * 100) if total_requests > 0 else 0
@@ -38,7 +45,17 @@ async def get_cache_stats():
         l2_hits=l2_stats["hits"],
         l2_misses=l2_stats["misses"],
         l1_size=len(l1_cache),
-        l2_keys=l2_keys_count,
+        l1_bytes=l1_cache.bytes,
+        l1_max_bytes=l1_cache.max_bytes,
+        l1_evictions=dict(l1_cache.evictions),
+        l1_invalidation_bus=cache_bus.status(),
+        l2_keys=await async_redis_client.dbsize(),
+        l2_namespaces=await async_redis_client.namespace_counts(),
+        l2_codec=get_codec_stats(),
+        swr=get_swr_stats(),
+        l1_warmup=l1_warmup.status(),
+        collections=collection_cache.status(),
+        compression=dict(compression_stats),
         hit_rate=round(hit_rate, 2)
     )
 
@@ -46,17 +63,14 @@ async def get_cache_stats():
 async def cache_set(request: CacheSetRequest):
     cache_key = f"playground:{request.key}"
     
-    expire_at = None
-    if request.ttl:
-        expire_at = time.time() + request.ttl
+    l1_cache.set(cache_key, request.value, request.ttl, soft_ttl=settings.l1_cache_soft_ttl)
     
-    l1_cache[cache_key] = (request.value, expire_at)
-    
-    if redis_client.is_connected():
-        redis_client.set(cache_key, request.value, request.ttl)
+    if async_redis_client.is_connected():
+        await async_redis_client.set(cache_key, request.value, request.ttl)
+        await cache_bus.publish(keys=[cache_key])
     
     message = f"Set '{request.key}' in L1 cache"
-    if redis_client.is_connected():
+    if async_redis_client.is_connected():
         message += " and L2 (Redis) cache"
         if request.ttl:
             message += f" with TTL of {request.ttl} seconds"
@@ -68,51 +82,54 @@ async def cache_set(request: CacheSetRequest):
         ttl=request.ttl
     )
 
+async def _revalidate_l1(cache_key: str):
+    value, ttl_remaining = (await async_redis_client.mget_with_ttl([cache_key]))[0]
+    if value is None:
+        l1_cache.delete(cache_key, reason="invalidated")
+        return
+    _, expire_at = _promotion_ttl(ttl_remaining)
+    l1_cache.set(cache_key, value, expire_at=expire_at, soft_ttl=settings.l1_cache_soft_ttl)
+
 @router.get("/get/{key}", response_model=CacheGetResponse)
-async def cache_get(key: str):
+async def cache_get(key: str, swr: bool = False):
     cache_key = f"playground:{key}"
     
-    if cache_key in l1_cache:
-        cached_data = l1_cache[cache_key]
-        value, expire_at = cached_data
+    # Opt in with ?swr=true: an L1 copy past its soft TTL is then returned while
+    # Redis is re-read in the background. By default the caller goes to Redis
+    # itself, as with stale_while_revalidate on cached queries
+    connected = async_redis_client.is_connected()
+    entry = l1_cache.get(cache_key, allow_stale=swr or not connected)
+    if entry is not None:
+        l1_stats["hits"] += 1
+        stale = connected and entry.is_stale()
+        if stale:
+            swr_stats["stale_served"] += 1
+            revalidator.schedule(cache_key, lambda: _revalidate_l1(cache_key))
         
-        if expire_at is not None and time.time() > expire_at:
-            del l1_cache[cache_key]
-        else:
-            l1_stats["hits"] += 1
-            
-            ttl_remaining = None
-            if expire_at is not None:
-                ttl_remaining = int(expire_at - time.time())
-            elif redis_client.is_connected():
-                ttl_remaining = redis_client.ttl(cache_key)
-                if ttl_remaining == -1:
-                    ttl_remaining = None
-            
-            return CacheGetResponse(
-                success=True,
-                key=key,
-                value=value,
-                source="L1 (in-memory)",
-                ttl=ttl_remaining,
-                message="Cache hit from L1"
-            )
+        ttl_remaining = entry.ttl()
+        if entry.expire_at is None and async_redis_client.is_connected():
+            ttl_remaining = await async_redis_client.ttl(cache_key)
+            if ttl_remaining == -1:
+                ttl_remaining = None
+        
+        return CacheGetResponse(
+            success=True,
+            key=key,
+            value=entry.value,
+            source="L1 (in-memory)",
+            ttl=ttl_remaining,
+            message="Stale hit from L1, revalidating in background" if stale else "Cache hit from L1"
+        )
     
     l1_stats["misses"] += 1
     
-    if redis_client.is_connected():
-        value = redis_client.get(cache_key)
-        if value:
+    if async_redis_client.is_connected():
+        value, ttl_remaining = (await async_redis_client.mget_with_ttl([cache_key]))[0]
+        if value is not None:
             l2_stats["hits"] += 1
             
-            ttl_remaining = redis_client.ttl(cache_key)
-            expire_at = None
-            if ttl_remaining and ttl_remaining > 0:
-                expire_at = time.time() + ttl_remaining
-            elif ttl_remaining == -1:
-                ttl_remaining = None
-            
-            l1_cache[cache_key] = (value, expire_at)
+            ttl_remaining, expire_at = _promotion_ttl(ttl_remaining)
+            l1_cache.set(cache_key, value, expire_at=expire_at, soft_ttl=settings.l1_cache_soft_ttl)
             
             return CacheGetResponse(
                 success=True,
@@ -140,13 +157,11 @@ async def cache_delete(key: str):
     cache_key = f"playground:{key}"
     affected = 0
     
-    if cache_key in l1_cache:
-        del l1_cache[cache_key]
+    if l1_cache.delete(cache_key):
         affected += 1
     
-    if redis_client.is_connected() and redis_client.exists(cache_key):
-        redis_client.delete(cache_key)
-        affected += 1
+    affected += await async_redis_client.mdelete([cache_key])
+    await cache_bus.publish(keys=[cache_key])
     
     if affected > 0:
         return CacheOperationResponse(
@@ -163,19 +178,13 @@ async def cache_delete(key: str):
 
 @router.post("/clear", response_model=CacheOperationResponse)
 async def cache_clear():
-    l1_count = len([k for k in list(l1_cache.keys()) if k.startswith("playground:")])
-    
-    for key in list(l1_cache.keys()):
-        if key.startswith("playground:"):
-            del l1_cache[key]
+    l1_count = 0
+    for key in l1_cache.keys():
+        if key.startswith("playground:") and l1_cache.delete(key):
+            l1_count += 1
     
-    l2_count = 0
-    if redis_client.is_connected():
-        all_keys = redis_client.get_all_keys()
-        playground_keys = [k for k in all_keys if k.startswith("playground:")]
-        for key in playground_keys:
-            redis_client.delete(key)
-        l2_count = len(playground_keys)
+    l2_count = await async_redis_client.unlink_prefix("playground:")
+    await cache_bus.publish(prefix="playground:")
     
     total_cleared = l1_count + l2_count
     
@@ -184,3 +193,102 @@ async def cache_clear():
         message=f"Cleared {total_cleared} playground cache entries",
         affected_keys=total_cleared
     )
+
+@router.post("/mset", response_model=CacheOperationResponse)
+async def cache_mset(request: CacheMSetRequest):
+    items = {f"playground:{item.key}": item for item in request.items}
+    
+    for cache_key, item in items.items():
+        l1_cache.set(cache_key, item.value, item.ttl, soft_ttl=settings.l1_cache_soft_ttl)
+    
+    if async_redis_client.is_connected():
+        await async_redis_client.mset(
+            {cache_key: item.value for cache_key, item in items.items()},
+            {cache_key: item.ttl for cache_key, item in items.items()}
+        )
+        await cache_bus.publish(keys=list(items))
+    
+    return CacheOperationResponse(
+        success=True,
+        message=f"Set {len(items)} keys in one batch",
+        affected_keys=len(items)
+    )
+
+@router.post("/mget", response_model=CacheMGetResponse)
+async def cache_mget(request: CacheKeysRequest):
+    # one result per distinct key, in first-seen order, so hit counts match the results
+    keys = list(dict.fromkeys(request.keys))
+    results = {}
+    residual = []
+    
+    # L1 answers what it can; only the remaining keys go to Redis, together
+    for key in keys:
+        entry = l1_cache.get(f"playground:{key}", allow_stale=not async_redis_client.is_connected())
+        if entry is None:
+            residual.append(key)
+            continue
+        results[key] = CacheGetResponse(
+            success=True,
+            key=key,
+            value=entry.value,
+            source="L1 (in-memory)",
+            ttl=entry.ttl(),
+            message="Cache hit from L1"
+        )
+    l1_hits = len(results)
+    l1_stats["hits"] += l1_hits
+    l1_stats["misses"] += len(residual)
+    
+    l2_hits = 0
+    round_trips = 0
+    if residual and async_redis_client.is_connected():
+        round_trips = 1
+        replies = await async_redis_client.mget_with_ttl([f"playground:{key}" for key in residual])
+        for key, (value, ttl_remaining) in zip(residual, replies):
+            if value is None:
+                continue
+            l2_hits += 1
+            ttl_remaining, expire_at = _promotion_ttl(ttl_remaining)
+            l1_cache.set(f"playground:{key}", value, expire_at=expire_at, soft_ttl=settings.l1_cache_soft_ttl)
+            results[key] = CacheGetResponse(
+                success=True,
+                key=key,
+                value=value,
+                source="L2 (Redis)",
+                ttl=ttl_remaining,
+                message="Cache hit from L2, promoted to L1"
+            )
+    l2_stats["hits"] += l2_hits
+    l2_stats["misses"] += len(residual) - l2_hits
+    
+    return CacheMGetResponse(
+        results=[
+            results[key] if key in results else CacheGetResponse(
+                success=False,
+                key=key,
+                value=None,
+                source="miss",
+                message="Cache miss - key not found in L1 or L2"
+            )
+            for key in keys
+        ],
+        l1_hits=l1_hits,
+        l2_hits=l2_hits,
+        misses=len(keys) - l1_hits - l2_hits,
+        l2_round_trips=round_trips
+    )
+
+@router.post("/mdelete", response_model=CacheOperationResponse)
+async def cache_mdelete(request: CacheKeysRequest):
+    cache_keys = [f"playground:{key}" for key in request.keys]
+    affected = sum(1 for cache_key in cache_keys if l1_cache.delete(cache_key))
+    
+    if async_redis_client.is_connected():
+        affected += await async_redis_client.mdelete(cache_keys)
+        await cache_bus.publish(keys=cache_keys)
+    
+    return CacheOperationResponse(
+        success=affected > 0,
+        message=f"Deleted {len(request.keys)} keys in one batch",
+        affected_keys=affected
+    )
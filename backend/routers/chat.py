@@ -1,6 +1,7 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException, Depends
 from pydantic import BaseModel, Field
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
 from datetime import datetime, timedelta
 from typing import List, Dict
 import uuid
@@ -8,8 +9,9 @@ import asyncio
 from collections import defaultdict
 import time
 
-from backend.database import get_db, SessionLocal
+from backend.database import get_db, AsyncSessionLocal
 from backend.models import ChatSession, ChatMessage
+from backend.services.query_cache import bump_tables
 
 router = APIRouter(prefix="/api/chat", tags=["chat"])
 
@@ -67,7 +69,7 @@ class ConnectionManager:
 manager = ConnectionManager()
 
 @router.post("/session", response_model=SessionResponse)
-async def create_session(session_data: SessionCreate, db: Session = Depends(get_db)):
+async def create_session(session_data: SessionCreate, db: AsyncSession = Depends(get_db)):
     username = session_data.username.strip()
     
     if not username:
@@ -85,7 +87,8 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
     )
     
     db.add(session)
-    db.commit()
+    await db.commit()
+    await bump_tables("chat_sessions")
     
     return SessionResponse(
         token=token,
@@ -94,10 +97,13 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
     )
 
 @router.get("/history", response_model=List[MessageResponse])
-async def get_message_history(limit: int = 200, db: Session = Depends(get_db)):
-    messages = db.query(ChatMessage).order_by(
-        ChatMessage.created_at.desc()
-    ).limit(min(limit, 200)).all()
+async def get_message_history(limit: int = 200, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(ChatMessage).order_by(
+            ChatMessage.created_at.desc()
+        ).limit(min(limit, 200))
+    )
+    messages = result.scalars().all()
     
     return [
         MessageResponse(
@@ -114,12 +120,13 @@ async def websocket_endpoint(websocket: WebSocket, token: str = ""):
         await websocket.close(code=1008, reason="Missing session token")
         return
     
-    db = SessionLocal()
+    db = AsyncSessionLocal()
     
     try:
-        session = db.query(ChatSession).filter(
-            ChatSession.token == token
-        ).first()
+        result = await db.execute(
+            select(ChatSession).where(ChatSession.token == token)
+        )
+        session = result.scalars().first()
         
         if not session:
             await websocket.close(code=1008, reason="Invalid session token")
@@ -132,7 +139,7 @@ async def websocket_endpoint(websocket: WebSocket, token: str = ""):
         await manager.connect(websocket)
         
         session.last_active = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         while True:
             data = await websocket.receive_json()
@@ -158,11 +165,12 @@ async def websocket_endpoint(websocket: WebSocket, token: str = ""):
             )
             
             db.add(message)
-            db.commit()
-            db.refresh(message)
+            await db.commit()
+            await db.refresh(message)
             
             session.last_active = datetime.utcnow()
-            db.commit()
+            await db.commit()
+            await bump_tables("chat_messages", "chat_sessions")
             
             await manager.broadcast({
                 "id": message.id,
@@ -177,23 +185,26 @@ async def websocket_endpoint(websocket: WebSocket, token: str = ""):
         print(f"WebSocket error: {e}")
         manager.disconnect(websocket)
     finally:
-        db.close()
+        await db.close()
 
 @router.delete("/cleanup")
-async def cleanup_expired_sessions(db: Session = Depends(get_db)):
-    expired_sessions = db.query(ChatSession).filter(
-        ChatSession.expires_at < datetime.utcnow()
-    ).all()
+async def cleanup_expired_sessions(db: AsyncSession = Depends(get_db)):
+    result = await db.execute(
+        select(ChatSession).where(ChatSession.expires_at < datetime.utcnow())
+    )
+    expired_sessions = result.scalars().all()
     
     deleted_count = 0
     for session in expired_sessions:
-        db.query(ChatMessage).filter(
-            ChatMessage.session_id == session.id
-        ).delete()
+        await db.execute(
+            delete(ChatMessage).where(ChatMessage.session_id == session.id)
+        )
         
-        db.delete(session)
+        await db.delete(session)
         deleted_count += 1
     
-    db.commit()
+    await db.commit()
+    if deleted_count:
+        await bump_tables("chat_messages", "chat_sessions")
     
     return {"deleted_sessions": deleted_count, "status": "success"}
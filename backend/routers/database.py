@@ -1,23 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import time
-import hashlib
+import json
 import sqlparse
+from typing import Optional
 
-from backend.database import get_db
+from backend.database import AsyncSessionLocal, get_db, get_read_db, get_pool_status, replica_router, is_primary_sticky
+from backend.config import settings
 from backend.schemas import (
-    QueryRequest, QueryResponse, ExplainQueryRequest, QueryPlan,
+    QueryRequest, QueryResponse, QueryStreamRequest, ExplainQueryRequest, QueryPlan,
     CachedQueryResponse, CachedQueryRequest, TransactionRequest,
     TransactionResponse, IndexRecommendation, QueryPlanVisualization,
-    SQLInjectionDemo
+    SQLInjectionDemo, ConnectionPoolMetrics
 )
-from backend.redis_client import redis_client
+from backend.services.query_governor import run_governed_query, open_governed_stream, governor_stats, ClientDisconnected
+from backend.services.query_cache import (
+    build_cache_key, lookup as lookup_cached, lookup_fresh, store as store_cached,
+    record_lookup, get_stats as get_query_cache_stats
+)
+from backend.services.single_flight import query_flight, RedisLease, wait_for_value, flight_stats
+from backend.services.swr import revalidator, xfetch_due, swr_stats, get_swr_stats
 
 router = APIRouter(prefix="/api", tags=["database"])
 
 @router.post("/execute-query", response_model=QueryResponse)
-async def execute_query(request: QueryRequest, db: Session = Depends(get_db)):
+async def execute_query(request: QueryRequest, http_request: Request, db: AsyncSession = Depends(get_read_db)):
     start_time = time.time()
     try:
         query_stripped = request.query.strip()
@@ -31,14 +40,14 @@ async def execute_query(request: QueryRequest, db: Session = Depends(get_db)):
                 execution_time=0
             )
         
-        result = db.execute(text(query_stripped))
-        rows = [dict(row._mapping) for row in result.fetchall()]
+        governed = await run_governed_query(db, query_stripped, http_request)
         
         execution_time = time.time() - start_time
         return QueryResponse(
             success=True,
-            data=rows,
-            execution_time=round(execution_time * 1000, 2)
+            data=governed.rows,
+            execution_time=round(execution_time * 1000, 2),
+            truncated=governed.truncated
         )
     except Exception as e:
         execution_time = time.time() - start_time
@@ -51,8 +60,78 @@ async def execute_query(request: QueryRequest, db: Session = Depends(get_db)):
             execution_time=round(execution_time * 1000, 2)
         )
 
+def _json_default(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+def _ndjson_line(payload) -> str:
+    return json.dumps(payload, default=_json_default) + "\n"
+
+@router.post("/execute-query/stream")
+async def execute_query_stream(request: QueryStreamRequest, http_request: Request):
+    query_stripped = request.query.strip()
+    query_words = query_stripped.lower().split()
+    if not query_words or query_words[0] != 'select':
+        raise HTTPException(status_code=400, detail="Only SELECT queries are allowed. Query must start with SELECT.")
+    
+    max_rows = settings.query_stream_max_rows
+    if request.max_rows is not None:
+        max_rows = max(0, min(request.max_rows, max_rows))
+    batch_size = settings.query_stream_batch_size
+    use_primary = is_primary_sticky(http_request)
+    
+    async def stream_rows():
+        start_time = time.perf_counter()
+        first_row_time = None
+        row_count = 0
+        truncated = False
+        error = None
+        
+        stream = None
+        async with replica_router.session(use_primary=use_primary) as db:
+            try:
+                stream = await open_governed_stream(
+                    db, query_stripped, http_request, max_rows=max_rows, batch_size=batch_size
+                )
+                yield _ndjson_line({"type": "columns", "columns": stream.columns})
+                
+                async for batch in stream.batches():
+                    if first_row_time is None:
+                        first_row_time = time.perf_counter()
+                    yield "".join(_ndjson_line(list(row)) for row in batch)
+            except ClientDisconnected:
+                # the governor cancelled the query; nobody is left to read a summary
+                return
+            except Exception as e:
+                error = str(e)
+            finally:
+                # also runs when the response is abandoned between batches
+                if stream is not None:
+                    await stream.close()
+        if stream is not None:
+            row_count = stream.rows
+            truncated = stream.truncated
+        
+        yield _ndjson_line({
+            "type": "summary",
+            "success": error is None,
+            "error": error,
+            "rows": row_count,
+            "truncated": truncated,
+            "max_rows": max_rows,
+            "time_to_first_row_ms": round((first_row_time - start_time) * 1000, 2) if first_row_time else None,
+            "execution_time": round((time.perf_counter() - start_time) * 1000, 2)
+        })
+    
+    return StreamingResponse(
+        stream_rows(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/db/analyze-query", response_model=QueryPlan)
-async def analyze_query(request: ExplainQueryRequest, db: Session = Depends(get_db)):
+async def analyze_query(request: ExplainQueryRequest, http_request: Request, db: AsyncSession = Depends(get_db)):
     start_time = time.time()
     
     query_stripped = request.query.strip()
@@ -61,8 +140,8 @@ async def analyze_query(request: ExplainQueryRequest, db: Session = Depends(get_
     
     try:
         explain_query = f"EXPLAIN ANALYZE {query_stripped}"
-        result = db.execute(text(explain_query))
-        plan_lines = [row[0] for row in result.fetchall()]
+        governed = await run_governed_query(db, explain_query, http_request, max_rows=10000)
+        plan_lines = [row[governed.columns[0]] for row in governed.rows]
         plan = "\n".join(plan_lines)
         
         execution_time = (time.time() - start_time) * 1000
@@ -103,8 +182,27 @@ async def analyze_query(request: ExplainQueryRequest, db: Session = Depends(get_
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+async def _revalidate_cached_query(cache_key: str, sql: str, ttl: int, stale_ttl: Optional[int]):
+    # Background refresh for stale-while-revalidate. It has no request to
+    # borrow a session from, and skips the work if another worker holds the lease.
+    # Like every query-cache fill it reads the primary: a lagging replica would
+    # store pre-write rows under the post-write version key
+    lease = RedisLease(cache_key, settings.query_cache_lease_ms)
+    if not await lease.acquire():
+        return
+    try:
+        start = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            governed = await run_governed_query(db, sql)
+        flight_stats["db_executions"] += 1
+        await store_cached(
+            cache_key, governed.rows, ttl, time.perf_counter() - start, stale_ttl, governed.truncated
+        )
+    finally:
+        await lease.release()
+
 @router.post("/db/cached-query", response_model=CachedQueryResponse)
-async def cached_query_execute(request: CachedQueryRequest, db: Session = Depends(get_db)):
+async def cached_query_execute(request: CachedQueryRequest, http_request: Request, db: AsyncSession = Depends(get_db)):
     query_stripped = request.query.strip()
     
     if not query_stripped.lower().startswith('select'):
@@ -115,32 +213,85 @@ async def cached_query_execute(request: CachedQueryRequest, db: Session = Depend
             error="Only SELECT queries are allowed"
         )
     
-    cache_key = f"query_cache:{hashlib.md5(query_stripped.encode()).hexdigest()}"
+    cache_key, query_fingerprint, tables = await build_cache_key(query_stripped)
     
-    cached_result = redis_client.get(cache_key) if redis_client.is_connected() else None
+    cached_result = await lookup_cached(cache_key)
+    fresh = cached_result is not None and cached_result.fresh
+    early = fresh and xfetch_due(cached_result.fresh_until, cached_result.delta, request.early_recompute_beta)
+    record_lookup(fresh)
     
-    if cached_result:
+    if fresh and not early:
         return CachedQueryResponse(
             success=True,
-            data=cached_result,
+            data=cached_result.rows,
             cached=True,
-            execution_time=0
+            execution_time=0,
+            truncated=cached_result.truncated,
+            fingerprint=query_fingerprint,
+            tables=tables
         )
     
+    if cached_result is not None and (request.stale_while_revalidate or early):
+        swr_stats["early_recomputes" if fresh else "stale_served"] += 1
+        revalidator.schedule(cache_key, lambda: _revalidate_cached_query(
+            cache_key, query_stripped, request.cache_ttl, request.stale_ttl
+        ))
+        return CachedQueryResponse(
+            success=True,
+            data=cached_result.rows,
+            cached=True,
+            stale=not fresh,
+            revalidating=True,
+            execution_time=0,
+            truncated=cached_result.truncated,
+            fingerprint=query_fingerprint,
+            tables=tables
+        )
+    
+    async def compute():
+        # One request per worker gets here per key (single flight); across
+        # workers the Redis lease picks a single leader to hit Postgres
+        lease = RedisLease(cache_key, settings.query_cache_lease_ms)
+        if not await lease.acquire():
+            if cached_result is not None:
+                flight_stats["stale_served"] += 1
+                return {"rows": cached_result.rows, "source": "stale", "truncated": cached_result.truncated}
+            peer = await wait_for_value(lambda: lookup_fresh(cache_key), lease)
+            if peer is not None:
+                return {"rows": peer.rows, "source": "peer", "truncated": peer.truncated}
+        try:
+            flight_stats["db_executions"] += 1
+            compute_start = time.perf_counter()
+            governed = await run_governed_query(db, query_stripped, http_request)
+            await store_cached(
+                cache_key, governed.rows, request.cache_ttl,
+                time.perf_counter() - compute_start, request.stale_ttl, governed.truncated
+            )
+            return {"rows": governed.rows, "source": "db", "truncated": governed.truncated}
+        finally:
+            await lease.release()
+    
     start_time = time.time()
     try:
-        result = db.execute(text(query_stripped))
-        rows = [dict(row._mapping) for row in result.fetchall()]
+        for attempt in range(2):
+            try:
+                outcome = await query_flight.do(cache_key, compute)
+                break
+            except ClientDisconnected:
+                # the leader's client went away; retry unless it was ours
+                if attempt or await http_request.is_disconnected():
+                    raise
         execution_time = (time.time() - start_time) * 1000
         
-        if redis_client.is_connected():
-            redis_client.set(cache_key, rows, request.cache_ttl)
-        
         return CachedQueryResponse(
             success=True,
-            data=rows,
-            cached=False,
-            execution_time=round(execution_time, 2)
+            data=outcome["rows"],
+            cached=outcome["source"] != "db",
+            stale=outcome["source"] == "stale",
+            execution_time=round(execution_time, 2),
+            truncated=outcome["truncated"],
+            fingerprint=query_fingerprint,
+            tables=tables
         )
     except Exception as e:
         execution_time = (time.time() - start_time) * 1000
@@ -152,7 +303,7 @@ async def cached_query_execute(request: CachedQueryRequest, db: Session = Depend
         )
 
 @router.post("/db/transaction", response_model=TransactionResponse)
-async def execute_transaction(request: TransactionRequest, db: Session = Depends(get_db)):
+async def execute_transaction(request: TransactionRequest, http_request: Request, db: AsyncSession = Depends(get_db)):
     start_time = time.time()
     
     try:
@@ -162,11 +313,11 @@ async def execute_transaction(request: TransactionRequest, db: Session = Depends
             if not query.lower().startswith('select'):
                 raise HTTPException(status_code=400, detail="Only SELECT queries allowed in demo")
             
-            result = db.execute(text(query))
-            rows = [dict(row._mapping) for row in result.fetchall()]
-            results.append({"query": query, "rows": len(rows), "data": rows[:5]})
+            governed = await run_governed_query(db, query, http_request)
+            rows = governed.rows
+            results.append({"query": query, "rows": len(rows), "data": rows[:5], "truncated": governed.truncated})
         
-        db.commit()
+        await db.commit()
         execution_time = (time.time() - start_time) * 1000
         
         return TransactionResponse(
@@ -175,7 +326,7 @@ async def execute_transaction(request: TransactionRequest, db: Session = Depends
             execution_time=round(execution_time, 2)
         )
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         execution_time = (time.time() - start_time) * 1000
         return TransactionResponse(
             success=False,
@@ -183,8 +334,24 @@ async def execute_transaction(request: TransactionRequest, db: Session = Depends
             execution_time=round(execution_time, 2)
         )
 
+@router.get("/db/pool-metrics", response_model=ConnectionPoolMetrics)
+async def get_pool_metrics():
+    return ConnectionPoolMetrics(**get_pool_status())
+
+@router.get("/db/replicas")
+async def get_replica_status():
+    return replica_router.status()
+
+@router.get("/db/governor/stats")
+async def get_governor_stats():
+    return governor_stats
+
+@router.get("/db/query-cache/stats")
+async def query_cache_stats():
+    return {**get_query_cache_stats(), "single_flight": flight_stats, "swr": get_swr_stats()}
+
 @router.get("/db/index-recommendations")
-async def get_index_recommendations(db: Session = Depends(get_db)):
+async def get_index_recommendations(db: AsyncSession = Depends(get_db)):
     recommendations = []
     
     recommendations.append(IndexRecommendation(
@@ -214,7 +381,7 @@ async def get_index_recommendations(db: Session = Depends(get_db)):
     return recommendations
 
 @router.post("/db/visualize-plan", response_model=QueryPlanVisualization)
-async def visualize_query_plan(request: ExplainQueryRequest, db: Session = Depends(get_db)):
+async def visualize_query_plan(request: ExplainQueryRequest, http_request: Request, db: AsyncSession = Depends(get_db)):
     if not request.query.strip().upper().startswith('SELECT'):
         raise HTTPException(status_code=400, detail="Only SELECT queries allowed")
     
@@ -222,11 +389,10 @@ async def visualize_query_plan(request: ExplainQueryRequest, db: Session = Depen
     
     try:
         explain_query = f"EXPLAIN (FORMAT JSON, ANALYZE, BUFFERS) {request.query}"
-        result = db.execute(text(explain_query))
-        row = result.fetchone()
-        if not row:
+        governed = await run_governed_query(db, explain_query, http_request, max_rows=1)
+        if not governed.rows:
             raise Exception("No query plan returned")
-        plan_data = row[0]
+        plan_data = governed.rows[0][governed.columns[0]]
         
         execution_time = (time.time() - start_time) * 1000
         
@@ -250,13 +416,13 @@ async def visualize_query_plan(request: ExplainQueryRequest, db: Session = Depen
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/demo/sql-injection", response_model=SQLInjectionDemo)
-async def sql_injection_demo(user_input: str, db: Session = Depends(get_db)):
+async def sql_injection_demo(user_input: str, db: AsyncSession = Depends(get_db)):
     safe_query = "SELECT * FROM users WHERE name = :name LIMIT 5"
     unsafe_query = f"SELECT * FROM users WHERE name = '{user_input}' LIMIT 5"
     
     safe_result = []
     try:
-        result = db.execute(text(safe_query), {"name": user_input})
+        result = await db.execute(text(safe_query), {"name": user_input})
         safe_result = [dict(row._mapping) for row in result]
     except:
         safe_result = []
@@ -269,7 +435,7 @@ async def sql_injection_demo(user_input: str, db: Session = Depends(get_db)):
         unsafe_result = [{"warning": "SQL injection attempt blocked in demo"}]
     else:
         try:
-            result = db.execute(text(unsafe_query))
+            result = await db.execute(text(unsafe_query))
             unsafe_result = [dict(row._mapping) for row in result]
             explanation = "Input is safe. Both queries return the same result."
         except:
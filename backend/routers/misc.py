@@ -1,22 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request
-from sqlalchemy.orm import Session
-from sqlalchemy import text
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import text, select
 from typing import List
 import time
 import uuid
 import asyncio
-import httpx
+import contextlib
 from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
 import resend
 
-from backend.database import get_db
+from backend.database import get_db, mark_primary_write, AsyncSessionLocal
 from backend.models import ContactMessage
 from backend.schemas import (
     ContactMessageCreate, ContactMessageResponse, FullTextSearchRequest,
     FullTextSearchResponse, CircuitBreakerStatus, BackgroundTaskRequest,
     BackgroundTaskResponse, ProxyRequest, ProxyResponse
 )
-from backend.redis_client import redis_client
+from backend.redis_client import async_redis_client
+from backend.services.query_cache import bump_tables
+from backend.services.http_client import proxy_clients
+from backend.services.response_cache import collection_cache, REVALIDATE_CACHE_CONTROL
 from backend.config import settings
 
 router = APIRouter(prefix="/api", tags=["misc"])
@@ -29,14 +32,14 @@ def set_circuit_breaker(breaker):
 
 async def simulate_data_export(task_id: str, params: dict):
     await asyncio.sleep(2)
-    if redis_client.is_connected():
-        redis_client.set(f"task:{task_id}", {"status": "completed", "result": "Export finished"}, 3600)
+    if async_redis_client.is_connected():
+        await async_redis_client.set(f"task:{task_id}", {"status": "completed", "result": "Export finished"}, 3600)
     print(f"Task {task_id}: Data export completed")
 
 async def simulate_report_generation(task_id: str, params: dict):
     await asyncio.sleep(3)
-    if redis_client.is_connected():
-        redis_client.set(f"task:{task_id}", {"status": "completed", "result": "Report generated"}, 3600)
+    if async_redis_client.is_connected():
+        await async_redis_client.set(f"task:{task_id}", {"status": "completed", "result": "Report generated"}, 3600)
     print(f"Task {task_id}: Report generation completed")
 
 
@@ -131,12 +134,15 @@ async def send_email_notification(name: str, email: str, message: str):
 async def create_contact(
     message: ContactMessageCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
     db_message = ContactMessage(**message.dict())
     db.add(db_message)
-    db.commit()
-    db.refresh(db_message)
+    await db.commit()
+    await db.refresh(db_message)
+    mark_primary_write(response)
+    await bump_tables("contact_messages")
     
     background_tasks.add_task(
         send_email_notification,
@@ -148,12 +154,13 @@ async def create_contact(
     return db_message
 
 @router.get("/contact", response_model=List[ContactMessageResponse])
-async def get_messages(db: Session = Depends(get_db)):
-    messages = db.query(ContactMessage).order_by(ContactMessage.created_at.desc()).all()
+async def get_messages(db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(ContactMessage).order_by(ContactMessage.created_at.desc()))
+    messages = result.scalars().all()
     return messages
 
 @router.post("/search/fulltext", response_model=FullTextSearchResponse)
-async def fulltext_search(request: FullTextSearchRequest, db: Session = Depends(get_db)):
+async def fulltext_search(request: FullTextSearchRequest, db: AsyncSession = Depends(get_db)):
     start_time = time.time()
     
     if request.table not in ['products', 'users', 'customers']:
@@ -167,7 +174,7 @@ async def fulltext_search(request: FullTextSearchRequest, db: Session = Depends(
         LIMIT 20
     """)
     
-    result = db.execute(query, {"search_term": request.search_term})
+    result = await db.execute(query, {"search_term": request.search_term})
     results = [dict(row._mapping) for row in result]
     
     execution_time = (time.time() - start_time) * 1000
@@ -226,11 +233,11 @@ async def create_background_task(request: BackgroundTaskRequest, background_task
     else:
         raise HTTPException(status_code=400, detail="Unknown task type")
 
-@router.get("/demo/posts")
-async def get_demo_posts(db: Session = Depends(get_db)):
-    result = db.execute(text("SELECT * FROM demo_posts ORDER BY created_at DESC"))
+async def _load_demo_posts() -> list:
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(text("SELECT * FROM demo_posts ORDER BY created_at DESC"))).all()
     posts = []
-    for row in result:
+    for row in rows:
         posts.append({
             "id": row.id,
             "title": row.title,
@@ -240,9 +247,14 @@ async def get_demo_posts(db: Session = Depends(get_db)):
         })
     return posts
 
+@router.get("/demo/posts")
+async def get_demo_posts(request: Request):
+    entry = await collection_cache.get("demo_posts", _load_demo_posts)
+    return entry.response(request, REVALIDATE_CACHE_CONTROL)
+
 @router.get("/demo/posts/{post_id}")
-async def get_demo_post(post_id: int, db: Session = Depends(get_db)):
-    result = db.execute(text("SELECT * FROM demo_posts WHERE id = :id"), {"id": post_id})
+async def get_demo_post(post_id: int, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(text("SELECT * FROM demo_posts WHERE id = :id"), {"id": post_id})
     row = result.first()
     if not row:
         raise HTTPException(status_code=404, detail="Post not found")
@@ -255,17 +267,20 @@ async def get_demo_post(post_id: int, db: Session = Depends(get_db)):
     }
 
 @router.post("/demo/posts")
-async def create_demo_post(post_data: dict, db: Session = Depends(get_db)):
+async def create_demo_post(post_data: dict, response: Response, db: AsyncSession = Depends(get_db)):
     title = post_data.get("title", "")
     body = post_data.get("body", "")
     user_id = post_data.get("userId", 1)
     
-    result = db.execute(
+    result = await db.execute(
         text("INSERT INTO demo_posts (title, body, user_id) VALUES (:title, :body, :user_id) RETURNING *"),
         {"title": title, "body": body, "user_id": user_id}
     )
     row = result.first()
-    db.commit()
+    await db.commit()
+    mark_primary_write(response)
+    await bump_tables("demo_posts")
+    collection_cache.invalidate("demo_posts")
     
     if row:
         return {
@@ -278,8 +293,8 @@ async def create_demo_post(post_data: dict, db: Session = Depends(get_db)):
     return {"error": "Failed to create post"}
 
 @router.get("/demo/users")
-async def get_demo_users(db: Session = Depends(get_db)):
-    result = db.execute(text("SELECT id, name, email FROM users LIMIT 10"))
+async def get_demo_users(db: AsyncSession = Depends(get_db)):
+    result = await db.execute(text("SELECT id, name, email FROM users LIMIT 10"))
     users = []
     for row in result:
         users.append({
@@ -294,33 +309,38 @@ async def proxy_request(proxy_req: ProxyRequest, request: Request):
     start_time = time.time()
     
     try:
-        target_url = proxy_req.url
-        
-        if not target_url.startswith(('http://', 'https://')):
-            target_url = f"http://127.0.0.1:8000{target_url if target_url.startswith('/') else '/' + target_url}"
+        client, target_url, host = proxy_clients.route(proxy_req.url)
+        if client is None:
+            raise RuntimeError("Proxy clients are not started")
         
         headers = proxy_req.headers or {}
+        content = proxy_req.body.encode() if proxy_req.body else None
         
-        async with httpx.AsyncClient(follow_redirects=True, timeout=10.0) as client:
+        # only external hosts are throttled; in-process calls never open a socket
+        slot = proxy_clients.host_slot(host) if host else contextlib.nullcontext()
+        async with slot:
             response = await client.request(
                 method=proxy_req.method,
                 url=target_url,
                 headers=headers,
                 params=proxy_req.query_params,
-                content=proxy_req.body.encode() if proxy_req.body else None
-            )
-            
-            execution_time = time.time() - start_time
-            
-            response_headers = dict(response.headers)
-            
-            return ProxyResponse(
-                status_code=response.status_code,
-                headers=response_headers,
-                body=response.text,
-                execution_time=execution_time * 1000,
-                error=None
+                content=content
             )
+        
+        execution_time = time.time() - start_time
+        
+        response_headers = dict(response.headers)
+        server_time = response_headers.get("x-process-time")
+        
+        return ProxyResponse(
+            status_code=response.status_code,
+            headers=response_headers,
+            body=response.text,
+            execution_time=execution_time * 1000,
+            server_time=float(server_time) * 1000 if server_time else None,
+            transport="asgi" if host is None else response.http_version,
+            error=None
+        )
     
     except Exception as e:
         execution_time = time.time() - start_time
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from pydantic import BaseModel
 from typing import List, Optional
@@ -7,12 +7,17 @@ import time
 import random
 import hashlib
 
-from backend.database import get_db
-from backend.redis_client import redis_client
+from backend.database import get_read_db
+from backend.redis_client import async_redis_client
+from backend.services.query_governor import run_governed_query
+from backend.services.response_cache import etag_matches, not_modified, REVALIDATE_CACHE_CONTROL
 from backend.quiz_questions import SQL_QUIZ_QUESTIONS
 
 router = APIRouter(prefix="/api/quiz", tags=["quiz"])
 
+# bumped on every leaderboard change, so GET can answer 304 from one Redis read
+LEADERBOARD_VERSION_KEY = "sql_quiz_leaderboard:version"
+
 class QuizQuestion(BaseModel):
     id: int
     question: str
@@ -69,7 +74,7 @@ async def get_quiz_questions(count: int = 10, difficulty: Optional[str] = None):
     ]
 
 @router.post("/validate", response_model=QuizAnswerResponse)
-async def validate_answer(request: QuizAnswerRequest, db: Session = Depends(get_db)):
+async def validate_answer(request: QuizAnswerRequest, http_request: Request, db: AsyncSession = Depends(get_read_db)):
     question = next((q for q in SQL_QUIZ_QUESTIONS if q["id"] == request.question_id), None)
     
     if not question:
@@ -86,10 +91,10 @@ async def validate_answer(request: QuizAnswerRequest, db: Session = Depends(get_
         )
     
     try:
-        user_result = db.execute(text(user_query))
-        user_rows = [dict(row._mapping) for row in user_result.fetchall()]
+        user_result = await run_governed_query(db, user_query, http_request)
+        user_rows = user_result.rows
         
-        expected_result = db.execute(text(expected_query))
+        expected_result = await db.execute(text(expected_query))
         expected_rows = [dict(row._mapping) for row in expected_result.fetchall()]
         
         def normalize_result(rows):
@@ -133,7 +138,7 @@ async def validate_answer(request: QuizAnswerRequest, db: Session = Depends(get_
 
 @router.post("/leaderboard/submit")
 async def submit_score(submission: LeaderboardSubmission):
-    if not redis_client.is_connected():
+    if not async_redis_client.is_connected():
         raise HTTPException(status_code=503, detail="Leaderboard service unavailable")
     
     if not submission.username or len(submission.username) < 2:
@@ -146,39 +151,48 @@ async def submit_score(submission: LeaderboardSubmission):
         leaderboard_key = "sql_quiz_leaderboard"
         user_key = f"quiz_user:{submission.username.lower()}"
         
-        existing_score = redis_client.redis.zscore(leaderboard_key, submission.username.lower())
+        existing_score = await async_redis_client.redis.zscore(leaderboard_key, submission.username.lower())
         
         if existing_score is None or submission.score > existing_score:
-            redis_client.redis.zadd(leaderboard_key, {submission.username.lower(): submission.score})
+            await async_redis_client.redis.zadd(leaderboard_key, {submission.username.lower(): submission.score})
             
-            redis_client.redis.hset(user_key, mapping={
+            await async_redis_client.redis.hset(user_key, mapping={
                 "username": submission.username,
                 "score": submission.score,
                 "time_taken": submission.time_taken,
                 "completed_at": str(time.time())
             })
-            redis_client.redis.expire(user_key, 86400 * 30)
+            await async_redis_client.redis.expire(user_key, 86400 * 30)
+            await async_redis_client.redis.incr(LEADERBOARD_VERSION_KEY)
             
             return {"success": True, "message": "Score submitted successfully", "new_record": existing_score is None or submission.score > existing_score}
         else:
             return {"success": True, "message": "Score recorded but not a new personal best", "new_record": False}
     
     except Exception as e:
+        async_redis_client.record_error(e)
         raise HTTPException(status_code=500, detail=f"Failed to submit score: {str(e)}")
 
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard(limit: int = 10):
-    if not redis_client.is_connected():
+async def get_leaderboard(request: Request, response: Response, limit: int = 10):
+    if not async_redis_client.is_connected():
         return []
     
     try:
+        version = await async_redis_client.redis.get(LEADERBOARD_VERSION_KEY) or 0
+        etag = f'W/"leaderboard-{version}-{limit}"'
+        if etag_matches(request, etag):
+            return not_modified(etag, REVALIDATE_CACHE_CONTROL)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
+        
         leaderboard_key = "sql_quiz_leaderboard"
-        top_scores = redis_client.redis.zrevrange(leaderboard_key, 0, limit - 1, withscores=True)
+        top_scores = await async_redis_client.redis.zrevrange(leaderboard_key, 0, limit - 1, withscores=True)
         
         leaderboard = []
         for rank, (username_lower, score) in enumerate(top_scores, start=1):
             user_key = f"quiz_user:{username_lower.decode() if isinstance(username_lower, bytes) else username_lower}"
-            user_data = redis_client.redis.hgetall(user_key)
+            user_data = await async_redis_client.redis.hgetall(user_key)
             
             if user_data and len(user_data) > 0:
                 if isinstance(list(user_data.keys())[0], bytes):
@@ -203,24 +217,25 @@ async def get_leaderboard(limit: int = 10):
         return leaderboard
     
     except Exception as e:
+        async_redis_client.record_error(e)
         print(f"Leaderboard error: {str(e)}")
         return []
 
 @router.get("/user-stats/{username}")
 async def get_user_stats(username: str):
-    if not redis_client.is_connected():
+    if not async_redis_client.is_connected():
         return {"rank": None, "score": 0, "time_taken": 0}
     
     try:
         leaderboard_key = "sql_quiz_leaderboard"
         user_key = f"quiz_user:{username.lower()}"
         
-        score = redis_client.redis.zscore(leaderboard_key, username.lower())
+        score = await async_redis_client.redis.zscore(leaderboard_key, username.lower())
         if score is None:
             return {"rank": None, "score": 0, "time_taken": 0}
         
-        rank = redis_client.redis.zrevrank(leaderboard_key, username.lower())
-        user_data = redis_client.redis.hgetall(user_key)
+        rank = await async_redis_client.redis.zrevrank(leaderboard_key, username.lower())
+        user_data = await async_redis_client.redis.hgetall(user_key)
         
         time_taken = 0
         if user_data and len(user_data) > 0:
@@ -235,4 +250,5 @@ async def get_user_stats(username: str):
         }
     
     except Exception as e:
+        async_redis_client.record_error(e)
         return {"rank": None, "score": 0, "time_taken": 0}
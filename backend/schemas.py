@@ -64,11 +64,16 @@ class ChallengeResponse(ChallengeBase):
 class QueryRequest(BaseModel):
     query: str
 
+class QueryStreamRequest(BaseModel):
+    query: str
+    max_rows: Optional[int] = None
+
 class QueryResponse(BaseModel):
     success: bool
     data: Optional[list] = None
     error: Optional[str] = None
     execution_time: float
+    truncated: bool = False
 
 class AuthDemoRequest(BaseModel):
     username: str
@@ -115,6 +120,12 @@ class QueryPlan(BaseModel):
 class CachedQueryRequest(BaseModel):
     query: str
     cache_ttl: int = 300
+    # opt in: serve an expired entry immediately and refresh it in the
+    # background, for up to stale_ttl seconds past cache_ttl
+    stale_while_revalidate: bool = False
+    stale_ttl: Optional[int] = None
+    # XFetch beta (1.0 is the usual value); 0 keeps early recompute off
+    early_recompute_beta: float = 0.0
 
 class CachedQueryResponse(BaseModel):
     success: bool
@@ -122,6 +133,11 @@ class CachedQueryResponse(BaseModel):
     cached: bool
     execution_time: float
     error: Optional[str] = None
+    truncated: bool = False
+    fingerprint: Optional[str] = None
+    tables: Optional[list[str]] = None
+    stale: bool = False
+    revalidating: bool = False
 
 class RateLimitStatus(BaseModel):
     endpoint: str
@@ -137,6 +153,11 @@ class ConnectionPoolMetrics(BaseModel):
     wait_count: int
     overflow_count: int
     healthy: bool
+    mode: Optional[str] = None
+    checkouts: int = 0
+    avg_checkout_ms: float = 0
+    checkout_latency_histogram: dict[str, int] = {}
+    last_error: Optional[str] = None
 
 class TransactionRequest(BaseModel):
     operations: list[dict]
@@ -167,7 +188,9 @@ class EndpointMetrics(BaseModel):
     endpoint: str
     total_requests: int
     avg_response_time: float
+    p50_response_time: float
     p95_response_time: float
+    p99_response_time: float
     error_rate: float
     last_accessed: Optional[str] = None
 
@@ -236,7 +259,17 @@ class MultiLevelCacheStats(BaseModel):
     l2_hits: int
     l2_misses: int
     l1_size: int
+    l1_bytes: int = 0
+    l1_max_bytes: int = 0
+    l1_evictions: dict = {}
+    l1_invalidation_bus: dict = {}
     l2_keys: int
+    l2_namespaces: dict = {}
+    l2_codec: dict = {}
+    swr: dict = {}
+    l1_warmup: dict = {}
+    collections: dict = {}
+    compression: dict = {}
     hit_rate: float
 
 class SQLInjectionDemo(BaseModel):
@@ -280,6 +313,19 @@ class CacheOperationResponse(BaseModel):
     message: str
     affected_keys: int
 
+class CacheMSetRequest(BaseModel):
+    items: list[CacheSetRequest]
+
+class CacheKeysRequest(BaseModel):
+    keys: list[str]
+
+class CacheMGetResponse(BaseModel):
+    results: list[CacheGetResponse]
+    l1_hits: int
+    l2_hits: int
+    misses: int
+    l2_round_trips: int
+
 class ProxyRequest(BaseModel):
     url: str
     method: str = "GET"
@@ -292,4 +338,6 @@ class ProxyResponse(BaseModel):
     headers: dict
     body: str
     execution_time: float
+    server_time: Optional[float] = None
+    transport: Optional[str] = None
     error: Optional[str] = None
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import os
+import uuid
+from typing import List, Optional
+
+import redis.asyncio as aioredis
+
+from backend.redis_client import async_redis_client, redis_host, redis_port
+from backend.services.l1_cache import L1Cache
+
+CACHE_BUS_CHANNEL = os.getenv("CACHE_BUS_CHANNEL", "cache:l1:invalidate")
+CACHE_BUS_RETRY_SECONDS = 2
+
+bus_stats = {"published": 0, "received": 0, "invalidated": 0, "reconnects": 0}
+
+class CacheBus:
+    # Keeps every worker's L1 coherent: writers publish the keys they touched
+    # and each worker drops its own copy, so reads still never go to Redis
+    # just to check freshness
+    def __init__(self):
+        self.worker_id = uuid.uuid4().hex
+        self.l1_cache: Optional[L1Cache] = None
+        self.subscribed = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, keys: Optional[List[str]] = None, prefix: Optional[str] = None):
+        if not async_redis_client.is_connected():
+            return
+        message = json.dumps({"origin": self.worker_id, "keys": keys, "prefix": prefix})
+        try:
+            await async_redis_client.publish(CACHE_BUS_CHANNEL, message)
+            bus_stats["published"] += 1
+        except Exception as e:
+            print(f"⚠️ Failed to publish L1 invalidation: {e}")
+
+    def apply(self, raw: str):
+        message = json.loads(raw)
+        if message.get("origin") == self.worker_id or self.l1_cache is None:
+            return
+        bus_stats["received"] += 1
+        if message.get("keys"):
+            for key in message["keys"]:
+                if self.l1_cache.delete(key, reason="invalidated"):
+                    bus_stats["invalidated"] += 1
+        elif message.get("prefix"):
+            for key in self.l1_cache.keys():
+                if key.startswith(message["prefix"]) and self.l1_cache.delete(key, reason="invalidated"):
+                    bus_stats["invalidated"] += 1
+
+    async def listen(self):
+        while True:
+            client = aioredis.Redis(host=redis_host, port=redis_port, decode_responses=True, socket_connect_timeout=2)
+            try:
+                async with client.pubsub() as pubsub:
+                    await pubsub.subscribe(CACHE_BUS_CHANNEL)
+                    self.subscribed = True
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            try:
+                                self.apply(message["data"])
+                            except (ValueError, TypeError):
+                                pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self.subscribed:
+                    print(f"⚠️ L1 invalidation bus disconnected: {e}")
+                    bus_stats["reconnects"] += 1
+            finally:
+                self.subscribed = False
+                await client.aclose()
+            await asyncio.sleep(CACHE_BUS_RETRY_SECONDS)
+
+    def start(self, l1_cache: L1Cache):
+        self.l1_cache = l1_cache
+        if self._task is None:
+            self._task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def status(self) -> dict:
+        return {"subscribed": self.subscribed, "channel": CACHE_BUS_CHANNEL, **bus_stats}
+
+cache_bus = CacheBus()
@@ -0,0 +1,223 @@
+import argparse
+import csv
+import io
+import math
+import random
+import time
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+
+from backend.database import engine
+from backend.services.bootstrap import run_bootstrap
+from backend.services.data_service import SAMPLE_TABLES
+from backend.services.query_cache import bump_tables_sync
+
+CHUNK_SIZE = 50_000
+REFERENCE_DATE = datetime(2025, 1, 1)
+
+FIRST_NAMES = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth",
+               "David", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Carlos", "Priya",
+               "Wei", "Aisha", "Dilroop", "Fatima", "Hiro", "Olga", "Mateo", "Sofia", "Arjun", "Emma"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+              "Singh", "Chen", "Kim", "Nguyen", "Patel", "Khan", "Ivanova", "Sato", "Cohen", "Rossi"]
+# City populations follow a rough Zipf curve, so weights fall off with rank
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "San Francisco", "Seattle", "Boston",
+          "Austin", "Denver", "Portland", "Miami", "Atlanta", "Toronto", "Vancouver", "London"]
+CITY_WEIGHTS = [1 / (rank + 1) for rank in range(len(CITIES))]
+CUSTOMER_STATUSES = (["active", "inactive", "suspended"], [75, 20, 5])
+ORDER_STATUSES = (["completed", "shipped", "pending", "cancelled", "refunded"], [68, 14, 12, 4, 2])
+PRODUCT_CATEGORIES = {
+    "Electronics": (4.8, 0.8),
+    "Accessories": (3.4, 0.7),
+    "Books": (2.9, 0.4),
+    "Home": (3.8, 0.8),
+    "Sports": (3.9, 0.9),
+    "Toys": (3.2, 0.6),
+}
+PRODUCT_NOUNS = ["Headphones", "Watch", "Stand", "Cable", "Speaker", "Webcam", "Keyboard", "Mouse", "Lamp",
+                 "Backpack", "Bottle", "Charger", "Monitor", "Chair", "Desk", "Novel", "Ball", "Puzzle"]
+PRODUCT_ADJECTIVES = ["Wireless", "Smart", "Pro", "Mini", "Ultra", "Classic", "Portable", "Ergonomic", "Eco", "Deluxe"]
+DEPARTMENTS = {
+    "Engineering": (115000, 22000, 35),
+    "Sales": (78000, 15000, 20),
+    "Marketing": (74000, 12000, 12),
+    "Support": (56000, 8000, 15),
+    "Finance": (88000, 14000, 8),
+    "Operations": (69000, 11000, 10),
+}
+POST_TOPICS = ["APIs", "Databases", "Caching", "Docker", "Kubernetes", "Testing", "Security", "Observability",
+               "Python", "TypeScript", "System Design", "Performance"]
+
+def plan_counts(orders: int) -> Dict[str, int]:
+    return {
+        "users": max(100, orders // 10),
+        "customers": max(50, orders // 20),
+        "orders": orders,
+        "products": max(200, orders // 1000),
+        "employees": max(50, orders // 2000),
+        "demo_posts": max(20, orders // 50),
+    }
+
+def _rng(seed: int, table: str, chunk: int) -> random.Random:
+    # string seeds hash deterministically, unlike tuples under PYTHONHASHSEED
+    return random.Random(f"{seed}:{table}:{chunk}")
+
+def _timestamp(rng: random.Random, days_back: int) -> datetime:
+    return REFERENCE_DATE - timedelta(seconds=rng.randrange(days_back * 86400))
+
+def _skewed_id(rng: random.Random, upper: int, skew: float = 2.5) -> int:
+    # Power-law pick: low ids are the "whales" that account for most activity
+    return min(upper, int(upper * rng.random() ** skew) + 1)
+
+def _users(rng, start, count, counts):
+    for user_id in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        age = min(80, max(18, int(rng.gauss(36, 11))))
+        city = rng.choices(CITIES, CITY_WEIGHTS)[0]
+        yield (user_id, f"{first} {last}", f"{first.lower()}.{last.lower()}.{user_id}@example.com",
+               age, city, _timestamp(rng, 3 * 365))
+
+def _customers(rng, start, count, counts):
+    for customer_id in range(start, start + count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        status = rng.choices(*CUSTOMER_STATUSES)[0]
+        # total_spent is recomputed from orders once they are loaded
+        yield (customer_id, f"{first} {last}", f"{first[0].lower()}{last.lower()}{customer_id}@email.com", status, "0.00")
+
+def _orders(rng, start, count, counts):
+    for order_id in range(start, start + count):
+        amount = min(9999.99, round(rng.lognormvariate(4.3, 0.9), 2))
+        yield (order_id, _skewed_id(rng, counts["customers"]), f"{amount:.2f}",
+               rng.choices(*ORDER_STATUSES)[0], _timestamp(rng, 2 * 365))
+
+def _products(rng, start, count, counts):
+    categories = list(PRODUCT_CATEGORIES)
+    for product_id in range(start, start + count):
+        category = rng.choice(categories)
+        mu, sigma = PRODUCT_CATEGORIES[category]
+        price = min(4999.99, round(rng.lognormvariate(mu, sigma), 2))
+        rating = min(5.0, max(1.0, rng.gauss(4.2, 0.45)))
+        yield (product_id, f"{rng.choice(PRODUCT_ADJECTIVES)} {rng.choice(PRODUCT_NOUNS)} {product_id}", category,
+               f"{price:.2f}", int(rng.expovariate(1 / 150)), f"{rating:.2f}")
+
+def _employees(rng, start, count, counts):
+    departments = list(DEPARTMENTS)
+    weights = [DEPARTMENTS[name][2] for name in departments]
+    managers = _manager_count(counts)
+    for employee_id in range(start, start + count):
+        department = departments[(employee_id - 1) % len(departments)] if employee_id <= managers \
+            else rng.choices(departments, weights)[0]
+        base, spread, _ = DEPARTMENTS[department]
+        salary = max(35000, rng.gauss(base, spread)) * (1.35 if employee_id <= managers else 1)
+        manager_id = None if employee_id <= managers else rng.randrange(1, managers + 1)
+        hire_date = date(2012, 1, 1) + timedelta(days=rng.randrange(13 * 365))
+        yield (employee_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", department,
+               f"{salary:.2f}", hire_date, manager_id)
+
+def _demo_posts(rng, start, count, counts):
+    for post_id in range(start, start + count):
+        topic = rng.choice(POST_TOPICS)
+        words = int(rng.lognormvariate(4, 0.6))
+        body = " ".join(rng.choice(POST_TOPICS).lower() for _ in range(max(5, words)))
+        yield (post_id, f"Notes on {topic} #{post_id}", body,
+               _skewed_id(rng, counts["users"], 3.0), _timestamp(rng, 365))
+
+def _manager_count(counts: Dict[str, int]) -> int:
+    return max(len(DEPARTMENTS), counts["employees"] // 20)
+
+GENERATORS = {
+    "users": (_users, "id, name, email, age, city, created_at"),
+    "customers": (_customers, "id, name, email, status, total_spent"),
+    "orders": (_orders, "id, customer_id, amount, status, order_date"),
+    "products": (_products, "id, name, category, price, stock, rating"),
+    "employees": (_employees, "id, name, department, salary, hire_date, manager_id"),
+    "demo_posts": (_demo_posts, "id, title, body, user_id, created_at"),
+}
+
+def _copy_chunk(task: Tuple[str, int, int, int, Dict[str, int]]) -> int:
+    table, start, count, seed, counts = task
+    generate, columns = GENERATORS[table]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rng = _rng(seed, table, start)
+    for row in generate(rng, start, count, counts):
+        writer.writerow(["" if value is None else value for value in row])
+    buffer.seek(0)
+
+    connection = engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.copy_expert(f"COPY {table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        connection.commit()
+    finally:
+        connection.close()
+    return count
+
+def _chunks(table: str, first_id: int, last_id: int, seed: int, counts: Dict[str, int]) -> List[tuple]:
+    return [
+        (table, start, min(CHUNK_SIZE, last_id - start + 1), seed, counts)
+        for start in range(first_id, last_id + 1, CHUNK_SIZE)
+    ]
+
+def generate(orders: int, seed: int = 42, workers: int = 4) -> Dict[str, int]:
+    counts = plan_counts(orders)
+    run_bootstrap()
+
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(SAMPLE_TABLES)} RESTART IDENTITY CASCADE"))
+
+    managers = _manager_count(counts)
+    # Phase 1 has no foreign keys into unloaded data; phase 2 references it
+    phases = [
+        _chunks("users", 1, counts["users"], seed, counts)
+        + _chunks("customers", 1, counts["customers"], seed, counts)
+        + _chunks("products", 1, counts["products"], seed, counts)
+        + _chunks("employees", 1, managers, seed, counts),
+        _chunks("orders", 1, counts["orders"], seed, counts)
+        + _chunks("employees", managers + 1, counts["employees"], seed, counts)
+        + _chunks("demo_posts", 1, counts["demo_posts"], seed, counts),
+    ]
+
+    with Pool(processes=workers) as pool:
+        for phase in phases:
+            # largest chunks first so the slowest COPY doesn't start last
+            for _ in pool.imap_unordered(_copy_chunk, sorted(phase, key=lambda task: -task[2])):
+                pass
+
+    with engine.begin() as conn:
+        conn.execute(text("""
+            UPDATE customers c SET total_spent = o.total
+            FROM (SELECT customer_id, SUM(amount) AS total FROM orders
+                  WHERE status <> 'cancelled' GROUP BY customer_id) o
+            WHERE c.id = o.customer_id
+        """))
+        for table in SAMPLE_TABLES:
+            conn.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))"))
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"ANALYZE {', '.join(SAMPLE_TABLES)}"))
+
+    bump_tables_sync(*SAMPLE_TABLES)
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill the playground tables with deterministic synthetic data")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="number of orders; other tables scale from it")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = generate(args.orders, args.seed, args.workers)
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"✅ Generated {total:,} rows in {elapsed:.1f}s ({math.floor(total / elapsed):,} rows/s) with seed {args.seed}")
+    for table, count in counts.items():
+        print(f"   {table}: {count:,}")
+
+if __name__ == "__main__":
+    main()
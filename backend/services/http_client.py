@@ -0,0 +1,110 @@
+import asyncio
+import importlib.util
+import os
+from collections import OrderedDict
+from typing import Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+PROXY_MAX_CONNECTIONS = int(os.getenv("PROXY_MAX_CONNECTIONS", "100"))
+PROXY_MAX_KEEPALIVE = int(os.getenv("PROXY_MAX_KEEPALIVE", "20"))
+PROXY_MAX_PER_HOST = int(os.getenv("PROXY_MAX_PER_HOST", "10"))
+PROXY_MAX_TRACKED_HOSTS = int(os.getenv("PROXY_MAX_TRACKED_HOSTS", "256"))
+PROXY_KEEPALIVE_EXPIRY = float(os.getenv("PROXY_KEEPALIVE_EXPIRY", "30"))
+PROXY_TIMEOUT = float(os.getenv("PROXY_TIMEOUT", "10"))
+PROXY_HTTP2 = os.getenv("PROXY_HTTP2", "false").lower() == "true"
+SELF_PORT = int(os.getenv("PORT", "8000"))
+
+LOOPBACK_HOSTS = {"127.0.0.1", "localhost", "0.0.0.0", "::1"}
+INTERNAL_BASE_URL = "http://portfolio.internal"
+
+class HostSlot:
+    # Caps concurrent requests to one host. in_flight counts holders and
+    # waiters, so a slot with none of either can be dropped safely
+    __slots__ = ("semaphore", "in_flight")
+
+    def __init__(self, limit: int):
+        self.semaphore = asyncio.Semaphore(limit)
+        self.in_flight = 0
+
+    async def __aenter__(self):
+        self.in_flight += 1
+        try:
+            await self.semaphore.acquire()
+        except BaseException:
+            self.in_flight -= 1
+            raise
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.semaphore.release()
+        self.in_flight -= 1
+
+class ProxyClients:
+    def __init__(self):
+        self.external: Optional[httpx.AsyncClient] = None
+        self.internal: Optional[httpx.AsyncClient] = None
+        self.http2 = False
+        self._host_slots: OrderedDict[str, HostSlot] = OrderedDict()
+
+    def start(self, app):
+        # HTTP/2 needs the optional `h2` package (httpx[http2])
+        self.http2 = PROXY_HTTP2 and importlib.util.find_spec("h2") is not None
+        self.external = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=PROXY_TIMEOUT,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=PROXY_MAX_CONNECTIONS,
+                max_keepalive_connections=PROXY_MAX_KEEPALIVE,
+                keepalive_expiry=PROXY_KEEPALIVE_EXPIRY
+            )
+        )
+        self.internal = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url=INTERNAL_BASE_URL,
+            follow_redirects=True,
+            timeout=PROXY_TIMEOUT
+        )
+
+    async def close(self):
+        for client in (self.external, self.internal):
+            if client is not None:
+                await client.aclose()
+        self.external = None
+        self.internal = None
+
+    def host_slot(self, host: str) -> HostSlot:
+        slot = self._host_slots.get(host)
+        if slot is not None:
+            self._host_slots.move_to_end(host)
+            return slot
+        slot = self._host_slots[host] = HostSlot(PROXY_MAX_PER_HOST)
+        if len(self._host_slots) > PROXY_MAX_TRACKED_HOSTS:
+            self._drop_idle_slots()
+        return slot
+
+    def _drop_idle_slots(self):
+        # Least recently used first. A slot with requests in flight is kept,
+        # or the next request to that host would get a fresh allowance
+        for host in list(self._host_slots):
+            if len(self._host_slots) <= PROXY_MAX_TRACKED_HOSTS:
+                break
+            if self._host_slots[host].in_flight == 0:
+                del self._host_slots[host]
+
+    def route(self, url: str) -> Tuple[httpx.AsyncClient, str, Optional[str]]:
+        # Returns (client, url, host to throttle). Relative paths and URLs that
+        # point back at this server are dispatched straight into the app
+        if not url.startswith(('http://', 'https://')):
+            return self.internal, url if url.startswith('/') else '/' + url, None
+
+        parts = urlsplit(url)
+        default_port = 443 if parts.scheme == "https" else 80
+        if parts.hostname in LOOPBACK_HOSTS and (parts.port or default_port) == SELF_PORT:
+            path = parts.path or "/"
+            return self.internal, f"{path}?{parts.query}" if parts.query else path, None
+        return self.external, url, parts.netloc
+
+proxy_clients = ProxyClients()
@@ -0,0 +1,168 @@
+import asyncio
+import heapq
+import sys
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+EVICTION_REASONS = ("expired", "capacity", "deleted", "invalidated", "oversize")
+MAX_TRACKED_KEYS = 10000
+
+def estimate_size(value: Any) -> int:
+    # Cheap approximation of the memory held by a cached value; containers are
+    # walked one level deep so a large dict of strings isn't counted as ~200 bytes
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set)):
+        size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+class L1Entry:
+    __slots__ = ("value", "expire_at", "soft_until", "size")
+
+    def __init__(self, value: Any, expire_at: Optional[float], size: int, soft_until: Optional[float] = None):
+        self.value = value
+        self.expire_at = expire_at
+        # after soft_until the entry should be revalidated; it is only served
+        # to callers that accept stale data until expire_at
+        self.soft_until = soft_until
+        self.size = size
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self.soft_until is not None and self.soft_until <= (now or time.time())
+
+    def ttl(self, now: Optional[float] = None) -> Optional[int]:
+        if self.expire_at is None:
+            return None
+        return max(0, int(self.expire_at - (now or time.time())))
+
+class L1Cache:
+    def __init__(self, max_bytes: int, purge_interval: float = 1.0):
+        self.max_bytes = max_bytes
+        self.purge_interval = purge_interval
+        self.bytes = 0
+        self.evictions = {reason: 0 for reason in EVICTION_REASONS}
+        self._entries: "OrderedDict[str, L1Entry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._purge_task: Optional[asyncio.Task] = None
+        self._access_counts: Counter = Counter()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, touch=False) is not None
+
+    def keys(self) -> Iterator[str]:
+        return iter(list(self._entries.keys()))
+
+    def get(self, key: str, touch: bool = True, allow_stale: bool = False) -> Optional[L1Entry]:
+        # reads are counted whether or not they hit, so keys L1 lost are still ranked
+        if touch and (key in self._access_counts or len(self._access_counts) < MAX_TRACKED_KEYS):
+            self._access_counts[key] += 1
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.time()
+        if entry.expire_at is not None and entry.expire_at <= now:
+            self._remove(key, "expired")
+            return None
+        if not allow_stale and entry.is_stale(now):
+            return None
+        if touch:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        expire_at: Optional[float] = None,
+        soft_ttl: Optional[float] = None
+    ) -> bool:
+        now = time.time()
+        if expire_at is None and ttl:
+            expire_at = now + ttl
+        soft_until = now + soft_ttl if soft_ttl else None
+        if soft_until is not None and expire_at is not None and soft_until >= expire_at:
+            soft_until = None
+        size = estimate_size(key) + estimate_size(value)
+        if size > self.max_bytes:
+            # would evict everything else and still not fit; the previous copy
+            # goes too, and the rejection is counted once as "oversize"
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old.size
+            self.evictions["oversize"] += 1
+            return False
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old.size
+        self._entries[key] = L1Entry(value, expire_at, size, soft_until)
+        self.bytes += size
+        if expire_at is not None:
+            heapq.heappush(self._expiry_heap, (expire_at, key))
+
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest, "capacity")
+        return True
+
+    def delete(self, key: str, reason: str = "deleted") -> bool:
+        if key not in self._entries:
+            return False
+        self._remove(key, reason)
+        return True
+
+    def _remove(self, key: str, reason: str):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        self.evictions[reason] += 1
+
+    def take_access_counts(self) -> Counter:
+        counts, self._access_counts = self._access_counts, Counter()
+        return counts
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        purged = 0
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expire_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            # heap items for overwritten or deleted keys are skipped lazily
+            if entry is not None and entry.expire_at == expire_at:
+                self._remove(key, "expired")
+                purged += 1
+
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [
+                (entry.expire_at, key) for key, entry in self._entries.items() if entry.expire_at is not None
+            ]
+            heapq.heapify(self._expiry_heap)
+        return purged
+
+    async def run_purger(self):
+        while True:
+            await asyncio.sleep(self.purge_interval)
+            self.purge_expired()
+
+    def start(self):
+        if self._purge_task is None:
+            self._purge_task = asyncio.create_task(self.run_purger())
+
+    async def stop(self):
+        if self._purge_task is not None:
+            self._purge_task.cancel()
+            self._purge_task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": dict(self.evictions),
+        }
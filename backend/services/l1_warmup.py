@@ -0,0 +1,184 @@
+import asyncio
+import glob
+import os
+import time
+from typing import Optional
+
+from backend.config import settings
+from backend.redis_client import async_redis_client
+from backend.redis_codec import default_codec
+from backend.services.l1_cache import L1Cache
+
+HOT_KEYS_KEY = "l1:hot_keys"
+HOT_KEYS_TTL = 86400
+FIRST_MINUTE = 60
+
+warmup_stats = {
+    "snapshot_loaded": 0,
+    "snapshot_files": 0,
+    "snapshot_skipped": None,
+    "snapshot_saved": 0,
+    "prefetched": 0,
+    "time_to_warm_ms": None,
+    "first_minute": None,
+}
+
+class L1Warmup:
+    # Refills a fresh worker's L1 from a snapshot the previous process wrote
+    # at shutdown, then from the keys that were read most in Redis-recorded
+    # access counts, so a deploy doesn't send the first wave of reads to L2
+    def __init__(self):
+        self.l1_cache: Optional[L1Cache] = None
+        self.l1_stats: Optional[dict] = None
+        self.booted_at = time.time()
+        self._tasks = []
+
+    def snapshot_files(self) -> list:
+        # one file per worker (path.<pid>); the bare path is from before that
+        path = settings.l1_snapshot_path
+        files = [f for f in glob.glob(f"{glob.escape(path)}.*") if not f.endswith(".tmp")]
+        if os.path.exists(path):
+            files.append(path)
+        return files
+
+    def load_snapshot(self) -> int:
+        files = self.snapshot_files()
+        if not files:
+            warmup_stats["snapshot_skipped"] = "missing"
+            return 0
+
+        # the same key can be in several workers' files; keep the copy that lives longest
+        merged = {}
+        skipped = {}
+        for path in files:
+            try:
+                age = time.time() - os.path.getmtime(path)
+                if age > settings.l1_snapshot_max_age:
+                    # a restart leaves new pids behind, so old files are removed here
+                    os.remove(path)
+                    skipped[path] = f"older than {settings.l1_snapshot_max_age}s"
+                    continue
+                with open(path, "rb") as f:
+                    entries = default_codec.decode(f.read())
+            except Exception as e:
+                skipped[path] = f"unreadable: {e}"
+                continue
+            for key, value, expire_at in entries:
+                current = merged.get(key)
+                if current is None or (current[1] is not None and (expire_at is None or expire_at > current[1])):
+                    merged[key] = (value, expire_at)
+        warmup_stats["snapshot_files"] = len(files) - len(skipped)
+        warmup_stats["snapshot_skipped"] = skipped or None
+
+        now = time.time()
+        loaded = 0
+        for key, (value, expire_at) in merged.items():
+            if expire_at is not None and expire_at <= now:
+                continue
+            # restored copies are already stale so the first read revalidates them
+            if self.l1_cache.set(key, value, expire_at=expire_at, soft_ttl=0.001):
+                loaded += 1
+        return loaded
+
+    def save_snapshot(self) -> int:
+        now = time.time()
+        entries = []
+        for key in self.l1_cache.keys():
+            entry = self.l1_cache.get(key, touch=False, allow_stale=True)
+            if entry is not None and (entry.expire_at is None or entry.expire_at > now):
+                entries.append((key, entry.value, entry.expire_at))
+
+        # each worker writes its own file so none overwrites another's; the
+        # next boot merges them. rename keeps a file whole if we die mid-write
+        path = f"{settings.l1_snapshot_path}.{os.getpid()}"
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(default_codec.encode(entries))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Failed to write L1 snapshot: {e}")
+            return 0
+        # files written before this process booted were merged into it already
+        for old_path in self.snapshot_files():
+            try:
+                if os.path.getmtime(old_path) < self.booted_at:
+                    os.remove(old_path)
+            except OSError:
+                pass
+        warmup_stats["snapshot_saved"] = len(entries)
+        return len(entries)
+
+    async def prefetch_hot_keys(self) -> int:
+        if not async_redis_client.is_connected() or settings.l1_prefetch_top_n <= 0:
+            return 0
+        hot = await async_redis_client.call(
+            lambda: async_redis_client.redis.zrevrange(HOT_KEYS_KEY, 0, settings.l1_prefetch_top_n - 1), []
+        )
+        keys = [key for key in hot if self.l1_cache.get(key, touch=False, allow_stale=True) is None]
+        if not keys:
+            return 0
+        fetched = 0
+        for key, (value, ttl_remaining) in zip(keys, await async_redis_client.mget_with_ttl(keys)):
+            if value is None or ttl_remaining == -2:
+                continue
+            expire_at = time.time() + ttl_remaining if ttl_remaining and ttl_remaining > 0 else None
+            if self.l1_cache.set(key, value, expire_at=expire_at, soft_ttl=settings.l1_cache_soft_ttl):
+                fetched += 1
+        return fetched
+
+    async def flush_access_counts(self):
+        counts = self.l1_cache.take_access_counts()
+        if not counts or not async_redis_client.is_connected():
+            return
+        async def operation():
+            pipe = async_redis_client.redis.pipeline(transaction=False)
+            for key, count in counts.items():
+                pipe.zincrby(HOT_KEYS_KEY, count, key)
+            pipe.expire(HOT_KEYS_KEY, HOT_KEYS_TTL)
+            await pipe.execute()
+        await async_redis_client.call(operation)
+
+    async def run_flusher(self):
+        while True:
+            await asyncio.sleep(settings.l1_access_flush_interval)
+            await self.flush_access_counts()
+
+    async def record_first_minute(self):
+        hits_at_boot = self.l1_stats["hits"]
+        misses_at_boot = self.l1_stats["misses"]
+        await asyncio.sleep(max(0.0, self.booted_at + FIRST_MINUTE - time.time()))
+        hits = self.l1_stats["hits"] - hits_at_boot
+        misses = self.l1_stats["misses"] - misses_at_boot
+        warmup_stats["first_minute"] = {
+            "l1_hits": hits,
+            "l1_misses": misses,
+            "hit_rate": round(hits / (hits + misses) * 100, 2) if hits + misses else None
+        }
+
+    async def start(self, l1_cache: L1Cache, l1_stats: dict):
+        self.l1_cache = l1_cache
+        self.l1_stats = l1_stats
+        self.booted_at = time.time()
+        start = time.perf_counter()
+        warmup_stats["snapshot_loaded"] = self.load_snapshot()
+        warmup_stats["prefetched"] = await self.prefetch_hot_keys()
+        warmup_stats["time_to_warm_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self._tasks = [
+            asyncio.create_task(self.run_flusher()),
+            asyncio.create_task(self.record_first_minute()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.l1_cache is None:
+            return
+        await self.flush_access_counts()
+        self.save_snapshot()
+
+    def status(self) -> dict:
+        return {**warmup_stats, "uptime_s": round(time.time() - self.booted_at, 1)}
+
+l1_warmup = L1Warmup()
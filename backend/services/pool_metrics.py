@@ -0,0 +1,61 @@
+import threading
+import time
+from typing import Dict, Optional
+
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.wait_count = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_error_at: Optional[float] = None
+        self.latency_total_ms = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record_checkout(self, seconds: float, waited: bool):
+        latency_ms = seconds * 1000
+        index = len(LATENCY_BUCKETS_MS)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                index = i
+                break
+        with self._lock:
+            self.checkouts += 1
+            self.latency_total_ms += latency_ms
+            self.bucket_counts[index] += 1
+            if waited:
+                self.wait_count += 1
+            self.last_error = None
+
+    def record_failure(self, error: Exception):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            self.last_error_at = time.time()
+
+    def connection_checked_out(self):
+        with self._lock:
+            self.in_use += 1
+
+    def connection_checked_in(self):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    @property
+    def healthy(self) -> bool:
+        return self.last_error is None
+
+    @property
+    def avg_checkout_ms(self) -> float:
+        return self.latency_total_ms / self.checkouts if self.checkouts else 0.0
+
+    def histogram(self) -> Dict[str, int]:
+        labels = [f"le_{bound}ms" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+        with self._lock:
+            return dict(zip(labels, self.bucket_counts))
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,162 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import select
+
+from backend.config import settings
+from backend.database import AsyncSessionLocal
+from backend.models import Project, Skill, Challenge
+from backend.redis_client import async_redis_client
+from backend.schemas import ProjectResponse, SkillResponse, ChallengeResponse
+from backend.services.query_cache import table_versions
+from backend.services.response_cache import CachedBody, encode_body
+
+PORTFOLIO_TABLES = ["projects", "skills", "challenges"]
+
+snapshot_stats = {"loads": 0, "load_failures": 0, "last_load_ms": None, "last_reason": None}
+
+class Record:
+    # Read-only row; subclasses list the table's columns as __slots__
+    __slots__ = ()
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class ProjectRecord(Record):
+    __slots__ = tuple(column.name for column in Project.__table__.columns)
+
+class SkillRecord(Record):
+    __slots__ = tuple(column.name for column in Skill.__table__.columns)
+
+class ChallengeRecord(Record):
+    __slots__ = tuple(column.name for column in Challenge.__table__.columns)
+
+class PortfolioData:
+    # One consistent generation; refreshes build a new one and swap it in
+    __slots__ = ("generation", "versions", "loaded_at", "projects", "skills", "challenges", "bodies")
+
+    def __init__(
+        self,
+        generation: int,
+        versions: List[int],
+        projects: Dict[int, ProjectRecord],
+        skills: Dict[int, SkillRecord],
+        challenges: Dict[int, ChallengeRecord],
+        bodies: Dict[str, CachedBody]
+    ):
+        self.generation = generation
+        self.versions = versions
+        self.loaded_at = time.monotonic()
+        self.projects = projects
+        self.skills = skills
+        self.challenges = challenges
+        self.bodies = bodies
+
+class PortfolioSnapshot:
+    # Projects, skills and challenges held in memory for REST, v1/v2 and
+    # GraphQL. Writers announce changes by bumping the tables' query-cache
+    # versions; the refresher polls those and also reloads on a timer to pick
+    # up edits made outside the app
+    def __init__(self, check_interval: float, refresh_interval: float):
+        self.check_interval = check_interval
+        self.refresh_interval = refresh_interval
+        self.data: Optional[PortfolioData] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self, reason: str) -> PortfolioData:
+        start = time.perf_counter()
+        # versions first: a bump that lands during the load triggers another one
+        versions = await table_versions(PORTFOLIO_TABLES)
+        async with AsyncSessionLocal() as db:
+            projects = (await db.execute(select(Project.__table__).order_by(Project.id))).all()
+            skills = (await db.execute(select(Skill.__table__).order_by(Skill.id))).all()
+            challenges = (await db.execute(select(Challenge.__table__).order_by(Challenge.id))).all()
+
+        generation = self.data.generation + 1 if self.data else 1
+        projects = {row.id: ProjectRecord(**row._mapping) for row in projects}
+        skills = {row.id: SkillRecord(**row._mapping) for row in skills}
+        challenges = {row.id: ChallengeRecord(**row._mapping) for row in challenges}
+        bodies = {
+            "projects": await encode_body(
+                [ProjectResponse.model_validate(p).model_dump(mode="json") for p in projects.values()], generation
+            ),
+            "skills": await encode_body(
+                [SkillResponse.model_validate(s).model_dump(mode="json") for s in skills.values()], generation
+            ),
+            "challenges": await encode_body(
+                [ChallengeResponse.model_validate(c).model_dump(mode="json") for c in challenges.values()], generation
+            ),
+        }
+        self.data = PortfolioData(generation, versions, projects, skills, challenges, bodies)
+        snapshot_stats["loads"] += 1
+        snapshot_stats["last_load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        snapshot_stats["last_reason"] = reason
+        return self.data
+
+    async def current(self) -> PortfolioData:
+        if self.data is not None:
+            return self.data
+        async with self._lock:
+            if self.data is None:
+                await self.load("first request")
+            return self.data
+
+    async def run_refresher(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if self.data is None:
+                continue
+            reason = None
+            if async_redis_client.is_connected() and await table_versions(PORTFOLIO_TABLES) != self.data.versions:
+                reason = "table version changed"
+            elif time.monotonic() - self.data.loaded_at >= self.refresh_interval:
+                reason = "refresh interval"
+            if reason is None:
+                continue
+            try:
+                async with self._lock:
+                    await self.load(reason)
+            except Exception as e:
+                # keep serving the previous generation
+                snapshot_stats["load_failures"] += 1
+                print(f"⚠️ Portfolio snapshot refresh failed: {e}")
+
+    async def start(self):
+        try:
+            async with self._lock:
+                await self.load("startup")
+        except Exception as e:
+            snapshot_stats["load_failures"] += 1
+            print(f"⚠️ Portfolio snapshot not loaded, retrying on first request: {e}")
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_refresher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def status(self) -> dict:
+        data = self.data
+        return {
+            **snapshot_stats,
+            "loaded": data is not None,
+            "generation": data.generation if data else None,
+            "projects": len(data.projects) if data else 0,
+            "skills": len(data.skills) if data else 0,
+            "challenges": len(data.challenges) if data else 0,
+        }
+
+portfolio_snapshot = PortfolioSnapshot(
+    settings.portfolio_snapshot_check_interval,
+    settings.portfolio_snapshot_refresh_interval
+)
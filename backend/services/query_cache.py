@@ -0,0 +1,187 @@
+import hashlib
+import time
+from typing import List, Optional, Tuple
+
+import sqlparse
+from sqlparse import tokens as T
+
+from backend.redis_client import async_redis_client, redis_client
+from backend.config import settings
+
+QUERY_CACHE_PREFIX = "query_cache:"
+TABLE_VERSION_PREFIX = "query_cache:table_version:"
+
+query_cache_stats = {"hits": 0, "misses": 0, "table_bumps": 0}
+
+def _flatten(sql: str):
+    for statement in sqlparse.parse(sql):
+        for token in statement.flatten():
+            if token.is_whitespace or token.ttype in T.Comment:
+                continue
+            yield token
+
+def _unquote(name: str) -> str:
+    if len(name) > 1 and name[0] == name[-1] == '"':
+        return name[1:-1]
+    return name.lower()
+
+def normalize_sql(sql: str) -> str:
+    parts = []
+    for token in _flatten(sql):
+        if token.ttype in T.Keyword:
+            parts.append(" ".join(token.value.upper().split()))
+        elif token.ttype in T.Name:
+            parts.append(token.value.lower())
+        else:
+            parts.append(token.value)
+    while parts and parts[-1] == ";":
+        parts.pop()
+    return " ".join(parts)
+
+def fingerprint(sql: str) -> str:
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+
+def extract_tables(sql: str) -> List[str]:
+    tables = []
+    expecting_table = False
+    in_from_list = False
+    after_table = False
+
+    for token in _flatten(sql):
+        is_name = token.ttype in T.Name or token.ttype in T.Literal.String.Symbol
+
+        if token.ttype in T.Keyword:
+            keyword = " ".join(token.value.upper().split())
+            if keyword == "AS" and after_table:
+                continue
+            expecting_table = keyword == "FROM" or keyword.endswith("JOIN")
+            in_from_list = keyword == "FROM" or (in_from_list and keyword.endswith("JOIN"))
+            after_table = False
+        elif expecting_table and is_name:
+            tables.append(_unquote(token.value))
+            expecting_table = False
+            after_table = True
+        elif after_table and token.value == ".":
+            # schema-qualified name: keep the part after the dot
+            tables.pop()
+            expecting_table = True
+            after_table = False
+        elif after_table and token.value == "," and in_from_list:
+            expecting_table = True
+            after_table = False
+        elif token.value in ("(", ")"):
+            expecting_table = False
+            after_table = False
+            in_from_list = False
+
+    return sorted(set(tables))
+
+def _version_key(table: str) -> str:
+    return f"{TABLE_VERSION_PREFIX}{table}"
+
+async def table_versions(tables: List[str]) -> List[int]:
+    if not tables or not async_redis_client.is_connected():
+        return [0] * len(tables)
+    try:
+        values = await async_redis_client.redis.mget([_version_key(table) for table in tables])
+        return [int(value) if value else 0 for value in values]
+    except Exception as e:
+        async_redis_client.record_error(e)
+        return [0] * len(tables)
+
+def _queue_bumps(pipe, tables):
+    for table in tables:
+        pipe.incr(_version_key(table))
+
+async def bump_tables(*tables: str):
+    if not tables or not async_redis_client.is_connected():
+        return
+    try:
+        pipe = async_redis_client.redis.pipeline(transaction=False)
+        _queue_bumps(pipe, tables)
+        await pipe.execute()
+        query_cache_stats["table_bumps"] += len(tables)
+    except Exception as e:
+        async_redis_client.record_error(e)
+        print(f"⚠️ Failed to bump query cache versions for {tables}: {e}")
+
+def bump_tables_sync(*tables: str):
+    # For scripts running outside the event loop, e.g. the data generator
+    if not tables or not redis_client.is_connected():
+        return
+    try:
+        pipe = redis_client.redis.pipeline(transaction=False)
+        _queue_bumps(pipe, tables)
+        pipe.execute()
+        query_cache_stats["table_bumps"] += len(tables)
+    except Exception as e:
+        redis_client.record_error(e)
+        print(f"⚠️ Failed to bump query cache versions for {tables}: {e}")
+
+async def build_cache_key(sql: str) -> Tuple[str, str, List[str]]:
+    # The key embeds the current version of every referenced table, so a write
+    # that bumps a version makes older entries unreachable instead of stale
+    query_fingerprint = fingerprint(sql)
+    tables = extract_tables(sql)
+    versions = await table_versions(tables)
+    version_tag = ",".join(f"{table}={version}" for table, version in zip(tables, versions))
+    version_hash = hashlib.sha1(version_tag.encode()).hexdigest()[:12]
+    return f"{QUERY_CACHE_PREFIX}{query_fingerprint}:{version_hash}", query_fingerprint, tables
+
+class CachedResult:
+    __slots__ = ("rows", "fresh_until", "delta", "truncated")
+
+    def __init__(self, rows: list, fresh_until: float, delta: float = 0.0, truncated: bool = False):
+        self.rows = rows
+        self.fresh_until = fresh_until
+        # seconds the query took to compute, used for early recompute
+        self.delta = delta
+        # rows were cut off at the governor's row cap
+        self.truncated = truncated
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+async def lookup(cache_key: str) -> Optional[CachedResult]:
+    # Entries outlive their TTL by a grace period so that, while one worker
+    # recomputes an expired key, the others can answer with the previous rows
+    if not async_redis_client.is_connected():
+        return None
+    cached = await async_redis_client.get(cache_key)
+    if not isinstance(cached, dict) or "rows" not in cached:
+        return None
+    return CachedResult(
+        cached["rows"], cached.get("fresh_until", 0), cached.get("delta", 0.0), cached.get("truncated", False)
+    )
+
+async def lookup_fresh(cache_key: str) -> Optional[CachedResult]:
+    cached = await lookup(cache_key)
+    return cached if cached is not None and cached.fresh else None
+
+async def store(
+    cache_key: str,
+    rows: list,
+    ttl: int,
+    delta: float = 0.0,
+    stale_ttl: Optional[int] = None,
+    truncated: bool = False
+) -> bool:
+    # ttl is the soft (fresh) lifetime; the entry survives stale_ttl longer so
+    # it can still be served while a refresh runs
+    if not async_redis_client.is_connected():
+        return False
+    if stale_ttl is None:
+        stale_ttl = settings.query_cache_stale_grace
+    envelope = {"rows": rows, "fresh_until": time.time() + ttl, "delta": round(delta, 4), "truncated": truncated}
+    return await async_redis_client.set(cache_key, envelope, ttl + stale_ttl)
+
+def record_lookup(hit: bool):
+    query_cache_stats["hits" if hit else "misses"] += 1
+
+def get_stats() -> dict:
+    total = query_cache_stats["hits"] + query_cache_stats["misses"]
+    return {
+        **query_cache_stats,
+        "hit_rate": round(query_cache_stats["hits"] / total * 100, 2) if total else 0
+    }
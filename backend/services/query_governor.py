@@ -0,0 +1,235 @@
+from fastapi import Request
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional, List
+import asyncio
+import anyio
+
+from backend.config import settings
+
+governor_stats = {
+    "queries": 0,
+    "streams": 0,
+    "statement_timeouts": 0,
+    "client_disconnects": 0,
+    "row_limit_hits": 0,
+}
+
+class QueryGovernorError(Exception):
+    pass
+
+class ClientDisconnected(QueryGovernorError):
+    pass
+
+class GovernedResult:
+    __slots__ = ("columns", "rows", "truncated")
+
+    def __init__(self, columns: List[str], rows: List[dict], truncated: bool):
+        self.columns = columns
+        self.rows = rows
+        self.truncated = truncated
+
+async def apply_limits(db: AsyncSession, timeout_ms: Optional[int] = None, work_mem: Optional[str] = None) -> int:
+    # is_local=true scopes both settings to the current transaction, like SET LOCAL
+    result = await db.execute(
+        text("""
+            SELECT pg_backend_pid(),
+                   set_config('statement_timeout', :timeout, true),
+                   set_config('work_mem', :work_mem, true)
+        """),
+        {
+            "timeout": str(timeout_ms or settings.query_statement_timeout_ms),
+            "work_mem": work_mem or settings.query_work_mem
+        }
+    )
+    return result.scalar()
+
+async def cancel_backend(db: AsyncSession, pid: int) -> bool:
+    try:
+        async with db.bind.connect() as conn:
+            result = await conn.execute(text("SELECT pg_cancel_backend(:pid)"), {"pid": pid})
+            return bool(result.scalar())
+    except Exception as e:
+        print(f"⚠️ Failed to cancel backend {pid}: {e}")
+        return False
+
+async def _wait_for_disconnect(request: Request):
+    # The body is already consumed, so the next ASGI message is the disconnect.
+    # Blocking on receive() also works underneath BaseHTTPMiddleware, where
+    # request.is_disconnected() never sees the message.
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+async def _fetch(db: AsyncSession, sql: str, params: Optional[dict], max_rows: int) -> GovernedResult:
+    result = await db.stream(text(sql), params or {})
+    try:
+        columns = list(result.keys())
+        rows = await result.fetchmany(max_rows + 1)
+    finally:
+        await result.close()
+    truncated = len(rows) > max_rows
+    return GovernedResult(columns, [dict(row._mapping) for row in rows[:max_rows]], truncated)
+
+async def run_governed_query(
+    db: AsyncSession,
+    sql: str,
+    request: Optional[Request] = None,
+    params: Optional[dict] = None,
+    max_rows: Optional[int] = None,
+    timeout_ms: Optional[int] = None,
+    work_mem: Optional[str] = None
+) -> GovernedResult:
+    max_rows = max_rows or settings.query_max_rows
+    timeout_ms = timeout_ms or settings.query_statement_timeout_ms
+    governor_stats["queries"] += 1
+
+    pid = await apply_limits(db, timeout_ms, work_mem)
+    query_task = asyncio.ensure_future(_fetch(db, sql, params, max_rows))
+
+    try:
+        if request is None:
+            governed = await query_task
+        else:
+            watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+            try:
+                done, _ = await asyncio.wait({query_task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                watcher.cancel()
+
+            if query_task not in done:
+                governor_stats["client_disconnects"] += 1
+                await cancel_backend(db, pid)
+                try:
+                    await query_task
+                except Exception:
+                    pass
+                raise ClientDisconnected("Client disconnected; query was cancelled")
+            governed = query_task.result()
+    except QueryGovernorError:
+        raise
+    except Exception as e:
+        raise _governor_error(e, timeout_ms)
+
+    if governed.truncated:
+        governor_stats["row_limit_hits"] += 1
+    return governed
+
+def _governor_error(e: Exception, timeout_ms: int) -> Exception:
+    if "statement timeout" in str(e):
+        governor_stats["statement_timeouts"] += 1
+        return QueryGovernorError(f"Query exceeded the {timeout_ms} ms statement timeout and was cancelled")
+    return e
+
+class GovernedStream:
+    # Streaming counterpart of run_governed_query. Each wait on Postgres races
+    # the client's disconnect, and a response that is cancelled or abandoned
+    # mid-query cancels the backend instead of leaving the query running
+    def __init__(self, db: AsyncSession, request: Optional[Request], pid: int, timeout_ms: int, max_rows: int, batch_size: int):
+        self.db = db
+        self.pid = pid
+        self.timeout_ms = timeout_ms
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.columns: List[str] = []
+        self.rows = 0
+        self.truncated = False
+        self._result = None
+        self._step: Optional[asyncio.Future] = None
+        # True while Postgres may still be working on the query
+        self._running = True
+        self._closed = False
+        self._watcher = asyncio.ensure_future(_wait_for_disconnect(request)) if request is not None else None
+
+    async def _wait(self, awaitable):
+        self._step = asyncio.ensure_future(awaitable)
+        waiting = {self._step} if self._watcher is None else {self._step, self._watcher}
+        try:
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if self._step not in done:
+                governor_stats["client_disconnects"] += 1
+                await self._cancel()
+                raise ClientDisconnected("Client disconnected; query was cancelled")
+            return self._step.result()
+        except QueryGovernorError:
+            raise
+        except Exception as e:
+            self._running = False
+            raise _governor_error(e, self.timeout_ms)
+
+    async def _cancel(self):
+        self._running = False
+        await cancel_backend(self.db, self.pid)
+        try:
+            await self._step
+        except BaseException:
+            pass
+
+    async def start(self, sql: str, params: Optional[dict]):
+        try:
+            self._result = await self._wait(
+                self.db.stream(text(sql), params or {}, execution_options={"yield_per": self.batch_size})
+            )
+        except BaseException:
+            await self.close()
+            raise
+        self.columns = list(self._result.keys())
+
+    async def batches(self) -> AsyncIterator[list]:
+        try:
+            while True:
+                batch = await self._wait(self._result.fetchmany(self.batch_size))
+                if not batch:
+                    break
+                remaining = self.max_rows - self.rows
+                if len(batch) > remaining:
+                    batch = batch[:remaining]
+                    self.truncated = True
+                self.rows += len(batch)
+                if batch:
+                    yield batch
+                if self.truncated:
+                    governor_stats["row_limit_hits"] += 1
+                    break
+            self._running = False
+        finally:
+            await self.close()
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._watcher is not None:
+            self._watcher.cancel()
+        # the response task may be cancelled already; cleanup still has to reach Postgres
+        with anyio.CancelScope(shield=True):
+            if self._running:
+                governor_stats["client_disconnects"] += 1
+                await self._cancel()
+            if self._result is not None:
+                try:
+                    await self._result.close()
+                except Exception:
+                    pass
+
+async def open_governed_stream(
+    db: AsyncSession,
+    sql: str,
+    request: Optional[Request] = None,
+    params: Optional[dict] = None,
+    max_rows: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    timeout_ms: Optional[int] = None,
+    work_mem: Optional[str] = None
+) -> GovernedStream:
+    max_rows = settings.query_stream_max_rows if max_rows is None else max_rows
+    batch_size = batch_size or settings.query_stream_batch_size
+    timeout_ms = timeout_ms or settings.query_statement_timeout_ms
+    governor_stats["queries"] += 1
+    governor_stats["streams"] += 1
+
+    pid = await apply_limits(db, timeout_ms, work_mem)
+    stream = GovernedStream(db, request, pid, timeout_ms, max_rows, batch_size)
+    await stream.start(sql, params)
+    return stream
@@ -0,0 +1,135 @@
+import math
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+KNOWN_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"}
+UNMATCHED_ROUTE = "unmatched"
+
+class LatencySketch:
+    # DDSketch (Masson et al.): values land in logarithmic buckets so every
+    # quantile is within `relative_accuracy` of the true value, memory stays
+    # bounded by max_bins, and two sketches merge by adding bucket counts
+    def __init__(self, relative_accuracy: float = 0.01, max_bins: int = 2048, min_value: float = 1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.max_bins = max_bins
+        self.min_value = min_value
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        if value <= self.min_value:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.bins[index] = self.bins.get(index, 0) + 1
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def _collapse(self):
+        # fold the lowest buckets together; only the fastest requests lose accuracy
+        indexes = sorted(self.bins)
+        excess = len(indexes) - self.max_bins
+        target = indexes[excess]
+        for index in indexes[:excess]:
+            self.bins[target] += self.bins.pop(index)
+
+    def merge(self, other: "LatencySketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+        if len(self.bins) > self.max_bins:
+            self._collapse()
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if seen > rank:
+                return min(2 * self.gamma ** index / (self.gamma + 1), self.max)
+        return self.max
+
+class EndpointStats:
+    __slots__ = ("sketch", "errors", "last_accessed")
+
+    def __init__(self):
+        self.sketch = LatencySketch()
+        self.errors = 0
+        self.last_accessed: Optional[float] = None
+
+class RequestMetrics:
+    # Keyed by route template ("/api/cache/get/{key}"), never by raw path, so
+    # the number of series is bounded by the number of routes
+    def __init__(self):
+        self.endpoints: Dict[Tuple[str, str], EndpointStats] = {}
+
+    def record(self, method: str, route: Optional[str], seconds: float, status_code: int):
+        if method not in KNOWN_METHODS:
+            method = "OTHER"
+        key = (method, route or UNMATCHED_ROUTE)
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats()
+        stats.sketch.add(seconds)
+        stats.last_accessed = time.time()
+        if status_code >= 400:
+            stats.errors += 1
+
+    def summary(self) -> List[dict]:
+        rows = []
+        for (method, route), stats in sorted(self.endpoints.items(), key=lambda item: item[0][1]):
+            sketch = stats.sketch
+            rows.append({
+                "endpoint": f"{method} {route}",
+                "total_requests": sketch.count,
+                "avg_response_time": round(sketch.sum / sketch.count * 1000, 3) if sketch.count else 0.0,
+                "p50_response_time": round(sketch.quantile(0.5) * 1000, 3),
+                "p95_response_time": round(sketch.quantile(0.95) * 1000, 3),
+                "p99_response_time": round(sketch.quantile(0.99) * 1000, 3),
+                "error_rate": round(stats.errors / sketch.count * 100, 2) if sketch.count else 0.0,
+                "last_accessed": datetime.fromtimestamp(stats.last_accessed, timezone.utc).isoformat() if stats.last_accessed else None
+            })
+        return rows
+
+    def prometheus(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route template",
+            "# TYPE http_request_duration_seconds summary",
+        ]
+        errors = [
+            "# HELP http_request_errors_total Responses with status >= 400 by route template",
+            "# TYPE http_request_errors_total counter",
+        ]
+        for (method, route), stats in sorted(self.endpoints.items(), key=lambda item: item[0][1]):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            sketch = stats.sketch
+            for q in QUANTILES:
+                lines.append(f'http_request_duration_seconds{{{labels},quantile="{q}"}} {sketch.quantile(q):.6f}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {sketch.sum:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {sketch.count}")
+            errors.append(f"http_request_errors_total{{{labels}}} {stats.errors}")
+        return "\n".join(lines + errors) + "\n"
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import orjson
+from fastapi import Request, Response
+
+from backend.compression import compression_stats, negotiate, precompress
+from backend.config import settings
+from backend.redis_client import async_redis_client
+from backend.services.query_cache import table_versions
+
+# Portfolio content changes rarely; the rest is revalidated on every use,
+# which is cheap once a 304 needs neither Postgres nor serialization
+PORTFOLIO_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+collection_stats = {"hits": 0, "version_checks": 0, "rebuilds": 0, "not_modified": 0}
+
+def make_etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    collection_stats["not_modified"] += 1
+    return Response(
+        status_code=304,
+        headers={"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    )
+
+class CachedBody:
+    __slots__ = ("body", "etag", "variants", "version", "checked_until")
+
+    def __init__(self, body: bytes, variants: Dict[str, bytes], version: int, checked_until: float):
+        self.body = body
+        self.etag = make_etag(body)
+        # gzip/br copies made once per version; each is its own representation
+        # and gets its own ETag
+        self.variants = variants
+        self.version = version
+        self.checked_until = checked_until
+
+    def response(self, request: Request, cache_control: str) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding")) if self.variants else None
+        if encoding not in self.variants:
+            encoding = None
+        etag = self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+        if etag_matches(request, etag):
+            return not_modified(etag, cache_control)
+
+        headers = {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if encoding is None:
+            return Response(content=self.body, media_type="application/json", headers=headers)
+        compression_stats["precompressed_served"] += 1
+        compression_stats["raw_bytes"] += len(self.body)
+        compression_stats["sent_bytes"] += len(self.variants[encoding])
+        headers["Content-Encoding"] = encoding
+        return Response(content=self.variants[encoding], media_type="application/json", headers=headers)
+
+async def encode_body(payload: Any, version: int) -> CachedBody:
+    body = orjson.dumps(payload)
+    variants = await asyncio.to_thread(precompress, body) if len(body) >= settings.compression_min_size else {}
+    return CachedBody(body, variants, version, 0.0)
+
+class CollectionCache:
+    # Holds the encoded JSON of read-mostly collections. Bodies are rebuilt only
+    # when the table's query-cache version moves, and that version is re-read
+    # from Redis at most once per check interval, so most requests just hand
+    # back bytes
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._entries: Dict[str, CachedBody] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get(self, table: str, load: Callable[[], Awaitable[list]]) -> CachedBody:
+        entry = self._entries.get(table)
+        now = time.monotonic()
+        if entry is not None and now < entry.checked_until:
+            collection_stats["hits"] += 1
+            return entry
+
+        lock = self._locks.setdefault(table, asyncio.Lock())
+        async with lock:
+            entry = self._entries.get(table)
+            if entry is not None and time.monotonic() < entry.checked_until:
+                collection_stats["hits"] += 1
+                return entry
+            collection_stats["version_checks"] += 1
+            version = (await table_versions([table]))[0]
+            # without Redis there is no version to compare, so rebuild once per interval
+            versioned = async_redis_client.is_connected()
+            if entry is None or entry.version != version or not versioned:
+                entry = self._entries[table] = await encode_body(await load(), version)
+                collection_stats["rebuilds"] += 1
+            entry.checked_until = time.monotonic() + self.check_interval
+            return entry
+
+    def invalidate(self, table: Optional[str] = None):
+        if table is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(table, None)
+
+    def status(self) -> dict:
+        return {
+            **collection_stats,
+            "collections": {
+                table: {
+                    "bytes": len(entry.body),
+                    "version": entry.version,
+                    **{f"{encoding}_bytes": len(variant) for encoding, variant in entry.variants.items()}
+                }
+                for table, entry in self._entries.items()
+            },
+        }
+
+collection_cache = CollectionCache(settings.collection_cache_check_interval)
@@ -0,0 +1,97 @@
+import asyncio
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from backend.redis_client import async_redis_client
+
+flight_stats = {
+    "leaders": 0,
+    "coalesced": 0,
+    "leases_acquired": 0,
+    "lease_waits": 0,
+    "stale_served": 0,
+    "db_executions": 0,
+}
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._inflight.get(key)
+        if future is not None:
+            flight_stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # keeps an unobserved exception from being logged when nobody else waited
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = future
+        flight_stats["leaders"] += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+class RedisLease:
+    def __init__(self, key: str, ttl_ms: int):
+        self.key = f"lease:{key}"
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+        self.acquired = False
+
+    async def acquire(self) -> bool:
+        if not async_redis_client.is_connected():
+            # without Redis there is nothing to coordinate with, act as leader
+            self.acquired = True
+            return True
+        try:
+            self.acquired = bool(await async_redis_client.redis.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        except Exception as e:
+            async_redis_client.record_error(e)
+            self.acquired = True
+        if self.acquired:
+            flight_stats["leases_acquired"] += 1
+        return self.acquired
+
+    async def release(self):
+        if not self.acquired or not async_redis_client.is_connected():
+            return
+        try:
+            await async_redis_client.redis.eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            async_redis_client.record_error(e)
+
+async def wait_for_value(
+    lookup: Callable[[], Awaitable[Optional[Any]]],
+    lease: RedisLease,
+    interval_ms: int = 50
+) -> Optional[Any]:
+    # Returns the leader's value, or None once this caller should compute it
+    # itself: either it took over an abandoned lease or the wait timed out
+    flight_stats["lease_waits"] += 1
+    waited = 0
+    while waited < lease.ttl_ms:
+        await asyncio.sleep(interval_ms / 1000)
+        waited += interval_ms
+        value = await lookup()
+        if value is not None:
+            return value
+        if await lease.acquire():
+            return None
+    return None
+
+query_flight = SingleFlight()
@@ -0,0 +1,57 @@
+import asyncio
+import math
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+
+swr_stats = {
+    "stale_served": 0,
+    "early_recomputes": 0,
+    "background_refreshes": 0,
+    "refresh_failures": 0,
+    "refreshes_coalesced": 0,
+}
+
+def xfetch_due(fresh_until: float, delta: float, beta: float, now: Optional[float] = None) -> bool:
+    # XFetch (Vattani et al.): recompute early with a probability that rises as
+    # expiry nears, scaled by how long the value took to compute. Spreads
+    # refreshes out instead of every caller noticing expiry at the same instant
+    if beta <= 0 or delta <= 0:
+        return False
+    now = now or time.time()
+    return now - delta * beta * math.log(1.0 - random.random()) >= fresh_until
+
+class Revalidator:
+    # Runs background refreshes, at most one per key per worker
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def schedule(self, key: str, refresh: Callable[[], Awaitable[None]]) -> bool:
+        if key in self._tasks:
+            swr_stats["refreshes_coalesced"] += 1
+            return False
+        self._tasks[key] = asyncio.create_task(self._run(key, refresh))
+        return True
+
+    async def _run(self, key: str, refresh: Callable[[], Awaitable[None]]):
+        try:
+            await refresh()
+            swr_stats["background_refreshes"] += 1
+        except Exception as e:
+            swr_stats["refresh_failures"] += 1
+            print(f"⚠️ Background refresh failed for {key}: {e}")
+        finally:
+            self._tasks.pop(key, None)
+
+    async def stop(self):
+        for task in list(self._tasks.values()):
+            task.cancel()
+        self._tasks.clear()
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+def get_swr_stats() -> dict:
+    return {**swr_stats, "pending_refreshes": revalidator.pending()}
+
+revalidator = Revalidator()